@@ -0,0 +1,72 @@
+from board import Board
+
+
+def resolve_action(board, players, cured_diseases, player, action):   # Time Complexity: O(H log H) for research, O(degree) otherwise
+    """
+    The rules of the seven action types in one place: checks `action` for `player` and
+    describes what it changes, without changing anything. GameState.perform_action and
+    PersistentGameState.apply_action both apply the returned effect to their own storage.
+    board: anything with the Board reads used below (get_cube_count, get_hospital_color,
+           get_hospital_city, has_railroad, get_railroads_remaining, is_connected_by_railroad);
+           a GameState passes its Board, a PersistentGameState passes itself
+    Returns: None when the action is illegal, otherwise one effect (each also spends one action):
+             ("move", city), ("build_railroad", city1, city2), ("build_hospital", city, color),
+             ("treat", city, color), ("transfer", giver_id, receiver_id, card), ("research", color, cards)
+    """
+    current = player.location
+    if current is None:
+        return None
+    action_type, target = action
+
+    if action_type == "move":
+        if target not in Board.CITY_COLORS or target == current:
+            return None
+        if not (target in Board.CITY_CONNECTIONS[current]
+                or board.is_connected_by_railroad(current, target)
+                or (current in Board.PORT_CITIES and target in Board.PORT_CITIES)):
+            return None
+        return ("move", target)
+
+    if action_type == "build_railroad":
+        if target not in Board.CITY_CONNECTIONS[current] or board.has_railroad(current, target):
+            return None
+        if board.get_railroads_remaining() <= 0:
+            return None
+        return ("build_railroad", current, target)
+
+    if action_type == "build_hospital":
+        # The hospital goes where the player stands; the action's target is not used
+        color = Board.CITY_COLORS.get(current)
+        if color is None or current not in player.hand or board.get_hospital_city(color) is not None:
+            return None
+        return ("build_hospital", current, color)
+
+    if action_type == "treat":
+        if target not in Board.DISEASE_COLORS or board.get_cube_count(current, target) == 0:
+            return None
+        return ("treat", current, target)
+
+    if action_type in ("give", "take"):
+        if not 0 <= target < len(players):
+            return None
+        other = players[target]
+        if other.id == player.id or other.location != current:
+            return None
+        giver, receiver = (player, other) if action_type == "give" else (other, player)
+        if current not in giver.hand:
+            return None
+        if action_type == "give" and len(receiver.hand) >= receiver.max_hand_size:
+            return None
+        return ("transfer", giver.id, receiver.id, current)
+
+    if action_type == "research":
+        # Cures the color of the hospital in the player's city; the action's target is not used
+        color = board.get_hospital_color(current)
+        if color is None or color in cured_diseases:
+            return None
+        cards = [card for card in sorted(player.hand) if Board.CITY_COLORS.get(card) == color][:5]
+        if len(cards) < 5:
+            return None
+        return ("research", color, cards)
+
+    return None
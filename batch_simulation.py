@@ -0,0 +1,163 @@
+import argparse
+import functools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from board import Board
+from cpu_player import GreedyCpuPolicy
+from mcts_player import MctsCpuPolicy
+from simulation import play_headless_game, LOSS_OUTBREAKS, LOSS_SUPPLY_EXHAUSTED, LOSS_DECK_EXHAUSTED
+
+
+Z_95 = 1.959963984540054
+
+
+def wilson_interval(successes, n, z=Z_95):   # Time Complexity: O(1)
+    """
+    Wilson score interval for a binomial proportion (stays inside [0, 1] for small counts).
+    Returns: (low, high)
+    """
+    if n == 0:
+        return (0.0, 0.0)
+    p = successes / n
+    denominator = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return (max(0.0, centre - margin), min(1.0, centre + margin))
+
+
+class BatchStatistics:
+    def __init__(self):  # Time Complexity: O(1)
+        self.games = 0
+        self.wins  = 0
+        self.loss_causes = {LOSS_OUTBREAKS: 0, LOSS_SUPPLY_EXHAUSTED: 0, LOSS_DECK_EXHAUSTED: 0}
+        self.cures = {color: 0 for color in Board.DISEASE_COLORS}
+        self.turns_total   = 0
+        self.turns_squared = 0
+
+    def add(self, result):   # Time Complexity: O(D) where D = number of diseases
+        self.games += 1
+        if result['won']:
+            self.wins += 1
+        cause = result['loss_cause']
+        if cause is not None:
+            self.loss_causes[cause] = self.loss_causes.get(cause, 0) + 1
+        for color in result['cured']:
+            self.cures[color] += 1
+        self.turns_total   += result['turns']
+        self.turns_squared += result['turns'] * result['turns']
+
+    def merge(self, other):   # Time Complexity: O(D)
+        self.games += other.games
+        self.wins  += other.wins
+        for cause, count in other.loss_causes.items():
+            self.loss_causes[cause] = self.loss_causes.get(cause, 0) + count
+        for color, count in other.cures.items():
+            self.cures[color] += count
+        self.turns_total   += other.turns_total
+        self.turns_squared += other.turns_squared
+
+    def turns_mean_interval(self, z=Z_95):   # Time Complexity: O(1)
+        if self.games == 0:
+            return (0.0, 0.0, 0.0)
+        mean = self.turns_total / self.games
+        if self.games < 2:
+            return (mean, mean, mean)
+        variance = max(0.0, (self.turns_squared - self.games * mean * mean) / (self.games - 1))
+        margin = z * math.sqrt(variance / self.games)
+        return (mean, mean - margin, mean + margin)
+
+    def summary(self):   # Time Complexity: O(D)
+        n = self.games
+        return {
+            'games': n,
+            'win_rate': self.wins / n if n else 0.0,
+            'win_rate_ci': wilson_interval(self.wins, n),
+            'loss_causes': {
+                cause: {'rate': count / n if n else 0.0, 'ci': wilson_interval(count, n)}
+                for cause, count in self.loss_causes.items()
+            },
+            'cures': {
+                color: {'rate': count / n if n else 0.0, 'ci': wilson_interval(count, n)}
+                for color, count in self.cures.items()
+            },
+            'turns': dict(zip(('mean', 'ci_low', 'ci_high'), self.turns_mean_interval())),
+        }
+
+
+def _play_seed_range(start, stop, policy_factory):   # Time Complexity: O(stop - start) games
+    # Runs in a worker process; a fresh policy per game keeps stateful policies independent
+    results = []
+    for seed in range(start, stop):
+        policies = [policy_factory(), policy_factory()]
+        results.append(play_headless_game(seed, policies))
+    return results
+
+
+def run_batch(num_games, workers=None, base_seed=0, chunk_size=None, policy_factory=GreedyCpuPolicy):   # Time Complexity: O(N / W) wall time
+    """
+    Plays seeds base_seed .. base_seed + num_games - 1 over a process pool.
+    policy_factory: picklable callable returning a CPU policy (a class works)
+    Yields: per-game result records as soon as their chunk finishes (completion order)
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        # A few chunks per worker balance the load without paying IPC per game
+        chunk_size = max(1, min(500, num_games // (workers * 8)))
+
+    if workers == 1:
+        for start in range(base_seed, base_seed + num_games, chunk_size):
+            yield from _play_seed_range(start, min(start + chunk_size, base_seed + num_games), policy_factory)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_play_seed_range, start, min(start + chunk_size, base_seed + num_games), policy_factory)
+            for start in range(base_seed, base_seed + num_games, chunk_size)
+        ]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def run_batch_statistics(num_games, workers=None, base_seed=0, chunk_size=None, policy_factory=GreedyCpuPolicy, on_result=None):   # Time Complexity: O(N / W) wall time
+    stats = BatchStatistics()
+    for result in run_batch(num_games, workers, base_seed, chunk_size, policy_factory):
+        stats.add(result)
+        if on_result is not None:
+            on_result(result)
+    return stats
+
+
+def format_summary(summary):   # Time Complexity: O(D)
+    def pct(rate, ci):
+        return f"{rate * 100:6.2f}%  [{ci[0] * 100:6.2f}%, {ci[1] * 100:6.2f}%]"
+
+    lines = [f"Games played: {summary['games']}"]
+    lines.append("Win rate:".ljust(32) + pct(summary['win_rate'], summary['win_rate_ci']))
+    for cause, data in summary['loss_causes'].items():
+        lines.append(f"Loss ({cause}):".ljust(32) + pct(data['rate'], data['ci']))
+    for color, data in summary['cures'].items():
+        lines.append(f"Cured {color}:".ljust(32) + pct(data['rate'], data['ci']))
+    turns = summary['turns']
+    lines.append("Turns per game:".ljust(32) + f"{turns['mean']:6.2f}   [{turns['ci_low']:6.2f}, {turns['ci_high']:6.2f}]")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo batch of headless CPU vs CPU games")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None, help="default: number of CPU cores")
+    parser.add_argument("--seed", type=int, default=0, help="first seed of the batch")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--policy", choices=("greedy", "mcts"), default="greedy")
+    parser.add_argument("--mcts-rollouts", type=int, default=200, help="MCTS iterations per action")
+    parser.add_argument("--mcts-time", type=float, default=None, help="MCTS seconds per action (overrides --mcts-rollouts)")
+    args = parser.parse_args()
+
+    policy_factory = GreedyCpuPolicy
+    if args.policy == "mcts":
+        # functools.partial of a class pickles, so it can be shipped to the worker processes
+        policy_factory = functools.partial(MctsCpuPolicy, rollouts=args.mcts_rollouts, time_budget=args.mcts_time)
+
+    stats = run_batch_statistics(args.games, args.workers, args.seed, args.chunk_size, policy_factory)
+    print(format_summary(stats.summary()))
@@ -0,0 +1,326 @@
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from board import Board
+from algorithms import bfs_traverse
+from game_state import GameState
+from cpu_player import GreedyCpuPolicy, choose_cpu_action
+from simulation import setup_headless_game, play_headless_turn
+from persistent_state import PersistentGameState
+
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+DEFAULT_THRESHOLD = 0.20  # flag anything more than 20% slower than the baseline
+SCENARIO_SEED = 2025
+MEMORY_GAMES = 200
+MIDGAME_TURNS = 10
+CHAIN_CITIES = ('Madrid', 'Valladolid', 'Burgos', 'Santander', 'Leon', 'Gijon')  # red cluster, primed to 3 cubes
+
+
+def _new_game(seed):   # Time Complexity: O(P + C)
+    game_state = GameState(seed)
+    policies = [GreedyCpuPolicy(), GreedyCpuPolicy()]
+    setup_headless_game(game_state, policies)
+    return game_state, policies
+
+
+def build_quiet_board(seed=SCENARIO_SEED):   # Time Complexity: O(P + C)
+    return _new_game(seed)[0]
+
+
+def build_chain_board(seed=SCENARIO_SEED):   # Time Complexity: O(P + C + V)
+    game_state = build_quiet_board(seed)
+    board = game_state.board
+    for city in board.cities:
+        board.remove_cubes(city, 'red', 3)
+    for city in CHAIN_CITIES:
+        board.add_cubes(city, 'red', 3)
+    return game_state
+
+
+def build_late_game_board(seed=SCENARIO_SEED, cards_left=12):   # Time Complexity: O(T × A × M)
+    # First seed (from `seed` upwards) whose game survives until the player deck is nearly empty
+    while True:
+        game_state, policies = _new_game(seed)
+        while not (game_state.check_loss() or game_state.check_win()):
+            if len(game_state.player_deck) <= cards_left:
+                return game_state
+            play_headless_turn(game_state, game_state.get_current_player(), policies)
+            game_state.next_turn()
+        seed += 1
+
+
+def _first_city(board, predicate):   # Time Complexity: O(V)
+    for city in board.cities:
+        if predicate(city):
+            return city
+    return board.cities[0]
+
+
+def _time_call(setup, run, min_time, max_batches, batch_size):   # Time Complexity: O(max_batches × batch_size × cost of run)
+    """
+    Times run(*setup()) in batches: batch_size argument tuples are prepared first (not timed),
+    then the calls are timed together so the timer overhead does not swamp microsecond calls.
+    Returns: list of per-call durations in seconds, one per batch
+    """
+    samples = []
+    total = 0.0
+    while len(samples) < max_batches and (total < min_time or len(samples) < 5):
+        batch = [setup() for _ in range(batch_size)]
+        start = time.perf_counter()
+        for args in batch:
+            run(*args)
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed / batch_size)
+        total += elapsed
+    return samples
+
+
+def collect_benchmarks():   # Time Complexity: O(1)
+    """
+    Returns: list of (name, setup, run). setup() returns the argument tuple for run, so
+    state-mutating calls always start from an untouched copy of the scenario.
+    """
+    scenarios = {
+        'quiet': build_quiet_board(),
+        'chain': build_chain_board(),
+        'late': build_late_game_board(),
+    }
+    benchmarks = []
+
+    graph = Board.CITY_CONNECTIONS
+    benchmarks.append(('bfs_traverse/far', lambda: (graph, 'Albufeira', 'Girona'), bfs_traverse))
+    benchmarks.append(('bfs_traverse/unreachable', lambda: (graph, 'Coruña', 'Mallorca'), bfs_traverse))
+
+    for name, state in scenarios.items():
+        board = state.board
+
+        def fresh(state=state):
+            return state.clone()
+
+        add_city = _first_city(board, lambda c, b=board: b.get_cube_count(c, b.get_city_color(c)) == 0)
+        add_color = board.get_city_color(add_city)
+        benchmarks.append((
+            f'board.add_cubes/{name}',
+            lambda fresh=fresh, city=add_city, color=add_color: (fresh().board, city, color, 1),
+            lambda b, city, color, count: b.add_cubes(city, color, count),
+        ))
+
+        outbreak_city = 'Madrid' if name == 'chain' else _first_city(
+            board, lambda c, b=board: b.get_cube_count(c, b.get_city_color(c)) >= 3)
+        outbreak_color = 'red' if name == 'chain' else board.get_city_color(outbreak_city)
+        benchmarks.append((
+            f'game_state.handle_outbreak/{name}',
+            lambda fresh=fresh, city=outbreak_city, color=outbreak_color: (fresh(), city, color),
+            lambda gs, city, color: gs.handle_outbreak(city, color),
+        ))
+        benchmarks.append((f'game_state.clone/{name}', lambda state=state: (state,), lambda gs: gs.clone()))
+        benchmarks.append((
+            f'game_state.handle_epidemic/{name}',
+            lambda fresh=fresh: (fresh(),),
+            lambda gs: gs.handle_epidemic(),
+        ))
+        benchmarks.append((
+            f'game_state.infect_cities/{name}',
+            lambda fresh=fresh: (fresh(),),
+            lambda gs: gs.infect_cities(),
+        ))
+        benchmarks.append((
+            f'game_state.apply_undo_infection/{name}',
+            lambda fresh=fresh: (fresh(),),
+            lambda gs: gs.undo(gs.apply_infection()),
+        ))
+        # Immutable: every call starts from the same version, no fresh copy needed
+        persistent = PersistentGameState.from_game_state(state)
+        benchmarks.append((
+            f'persistent.draw_player_card/{name}',
+            lambda persistent=persistent: (persistent,),
+            lambda ps: ps.draw_player_card(),
+        ))
+        benchmarks.append((
+            f'persistent.infect_cities/{name}',
+            lambda persistent=persistent: (persistent,),
+            lambda ps: ps.infect_cities(),
+        ))
+
+        def cpu_setup(fresh=fresh):
+            gs = fresh()
+            player = gs.get_current_player()
+            player.cpu_first_action_done = True  # exercise the full rule list, not the opening shortcut
+            return (gs, player)
+        benchmarks.append((f'choose_cpu_action/{name}', cpu_setup, choose_cpu_action))
+
+    visualizer_benchmarks = _collect_visualizer_benchmarks(scenarios['chain'])
+    benchmarks.extend(visualizer_benchmarks)
+    return benchmarks
+
+
+def _collect_visualizer_benchmarks(game_state):   # Time Complexity: O(W × H) for window creation
+    # Offscreen rendering; skipped when pygame or the map images are unavailable
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    if importlib.util.find_spec("pygame") is None:
+        print("Skipping PygameMapVisualizer.update benchmarks: pygame is not installed", file=sys.stderr)
+        return []
+    from pygame_visualizer import PygameMapVisualizer
+    try:
+        visualizer = PygameMapVisualizer(game_state)
+    except SystemExit:   # the visualizer exits when the display or a map image cannot be loaded
+        print("Skipping PygameMapVisualizer.update benchmarks: no display or map images", file=sys.stderr)
+        return []
+
+    def full_redraw():
+        # mark_dirty is O(1); it has to run inside the timed call since batches are prepared up front
+        visualizer.mark_dirty()
+        visualizer.update()
+
+    return [
+        ('visualizer.update/full_redraw', lambda: (), full_redraw),
+        ('visualizer.update/idle', lambda: (), visualizer.update),
+    ]
+
+
+def run_benchmarks(min_time=0.2, max_batches=50, batch_size=20, name_filter=None):   # Time Complexity: O(B × max_batches × batch_size) where B = number of benchmarks
+    results = {}
+    for name, setup, run in collect_benchmarks():
+        if name_filter and name_filter not in name:
+            continue
+        samples = _time_call(setup, run, min_time, max_batches, batch_size)
+        results[name] = {
+            'median_us': statistics.median(samples) * 1e6,
+            'min_us': min(samples) * 1e6,
+            'calls': len(samples) * batch_size,
+        }
+    return results
+
+
+def _build_midgame(seed, turns=MIDGAME_TURNS):   # Time Complexity: O(turns × A × M)
+    game_state, policies = _new_game(seed)
+    for _ in range(turns):
+        if game_state.check_loss() or game_state.check_win():
+            break
+        play_headless_turn(game_state, game_state.get_current_player(), policies)
+        game_state.next_turn()
+    return game_state
+
+
+def measure_bytes_per_game(build, count):   # Time Complexity: O(count × cost of build)
+    """
+    Keeps `count` games alive at once and reports the traced heap growth divided by count.
+    One game is built before tracing starts so shared, lazily built tables are not charged to it.
+    """
+    build(SCENARIO_SEED)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    games = [build(SCENARIO_SEED + i) for i in range(count)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del games
+    return (after - before) / count
+
+
+def run_memory_benchmarks(count=MEMORY_GAMES, name_filter=None):   # Time Complexity: O(count × (setup + MIDGAME_TURNS turns))
+    scenarios = {
+        'memory/game_state.setup': lambda seed: _new_game(seed)[0],
+        'memory/game_state.midgame': _build_midgame,
+    }
+    results = {}
+    for name, build in scenarios.items():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = {'bytes_per_game': measure_bytes_per_game(build, count), 'games': count}
+    return results
+
+
+def build_report(results, memory=None):   # Time Complexity: O(B)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        'timings': results,
+        'memory': memory or {},
+    }
+
+
+def compare_reports(baseline, current, threshold=DEFAULT_THRESHOLD, metric='min_us'):   # Time Complexity: O(B)
+    """
+    Returns: (lines, regressions) where regressions lists the benchmark names whose
+    `metric` got slower than the baseline by more than `threshold` (0.2 = 20%).
+    The fastest batch (min_us) is the default metric: it is the least sensitive to machine noise.
+    """
+    lines = [f"{'benchmark':45} {'baseline':>12} {'current':>12} {'change':>9}"]
+    regressions = []
+    base_timings = baseline.get('timings', {})
+    for name, data in current['timings'].items():
+        if name not in base_timings:
+            lines.append(f"{name:45} {'-':>12} {data[metric]:10.2f}us {'new':>9}")
+            continue
+        before = base_timings[name][metric]
+        after  = data[metric]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  << REGRESSION"
+        lines.append(f"{name:45} {before:10.2f}us {after:10.2f}us {change * 100:+8.1f}%{flag}")
+
+    # Memory is deterministic enough to use the same threshold on bytes per live game
+    base_memory = baseline.get('memory', {})
+    for name, data in current.get('memory', {}).items():
+        after = data['bytes_per_game']
+        if name not in base_memory:
+            lines.append(f"{name:45} {'-':>12} {after:11.0f}B {'new':>9}")
+            continue
+        before = base_memory[name]['bytes_per_game']
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  << REGRESSION"
+        lines.append(f"{name:45} {before:11.0f}B {after:11.0f}B {change * 100:+8.1f}%{flag}")
+    return lines, regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for the engine hot paths")
+    parser.add_argument("--output", default=DEFAULT_BASELINE, help="where to write the results (JSON)")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a stored baseline instead of overwriting it")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="relative slowdown flagged as a regression")
+    parser.add_argument("--metric", choices=("min_us", "median_us"), default="min_us", help="statistic compared against the baseline")
+    parser.add_argument("--filter", default=None, help="only run benchmarks whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds spent per benchmark")
+    parser.add_argument("--memory-games", type=int, default=MEMORY_GAMES, help="games kept alive by the memory benchmarks (0 skips them)")
+    args = parser.parse_args()
+
+    memory = run_memory_benchmarks(args.memory_games, args.filter) if args.memory_games > 0 else {}
+    report = build_report(run_benchmarks(args.min_time, name_filter=args.filter), memory)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        lines, regressions = compare_reports(baseline, report, args.threshold, args.metric)
+        print("\n".join(lines))
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nNo regressions.")
+    else:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        for name, data in report['timings'].items():
+            print(f"{name:45} {data['median_us']:10.2f}us  ({data['calls']} calls)")
+        for name, data in report['memory'].items():
+            print(f"{name:45} {data['bytes_per_game']:10.0f}B   ({data['games']} live games)")
+        print(f"\nBaseline written to {args.output}")
@@ -1,14 +1,24 @@
+from itertools import count
 from data_structures import Graph
-from algorithms import bfs_traverse
+from board_core import MapIndex, BoardCore, CubeMapView, mask_to_indices
+from zobrist import ZobristKeys
+from movement import compute_movement_tree, trace_movement_path
 
 
-def bfs_shortest_path(graph, start, end):   # Time Complexity: O(V + E), Space Complexity: O(V)
+def merge_outbreak_connections(city_connections, outbreak_only_connections):   # Time Complexity: O(V + E)
     """
-    Wrapper function for BFS traversal to find shortest path.
-    graph: adjacency list dictionary (from Graph.get_adjacency_list() or CITY_CONNECTIONS)
-    Returns: list representing shortest path from start to end, or None if no path exists
+    Outbreak adjacency of every city: regular neighbors first, then outbreak-only ones,
+    duplicates dropped (first occurrence wins). The fixed order keeps cascades reproducible.
+    Returns: dict city -> tuple of neighboring cities
     """
-    return bfs_traverse(graph, start, end)
+    return {
+        city: tuple(dict.fromkeys(list(neighbors) + outbreak_only_connections.get(city, [])))
+        for city, neighbors in city_connections.items()
+    }
+
+
+_railroad_versions = count(1)   # unique across all boards, so a version always means one exact network;
+                                # 0 is the empty network, shared by every board without railroads
 
 
 class Board:
@@ -69,6 +79,8 @@ class Board:
         'Valencia': ['Mallorca'],
     }
     
+    OUTBREAK_NEIGHBORS = merge_outbreak_connections(CITY_CONNECTIONS, OUTBREAK_ONLY_CONNECTIONS)
+    
     CITY_COLORS = {
         'Albufeira': 'blue',
         'Lisboa': 'blue',
@@ -123,100 +135,279 @@ class Board:
     DISEASE_COLORS = ['yellow', 'blue', 'black', 'red']
     MAX_CUBES_PER_COLOR = 24
     
+    PORT_CITIES = frozenset({
+        'Albufeira', 'Lisboa', 'Porto', 'Vigo', 'Coruña', 'Gijon', 'Santander',
+        'San Sebastian', 'Barcelona', 'Tarragona', 'Valencia', 'Alicante',
+        'Cartagena', 'Almeria', 'Malaga', 'Gibraltar', 'Cadiz', 'Huelva', 'Mallorca'
+    })
+    PORT_CITIES_SORTED = tuple(sorted(PORT_CITIES))
+    
+    _EMPTY_NETWORK_MOVEMENT_TREES = {}   # see update_railroad_graph
+    
+    # Cities 0..47 and colors 0..3 as index tuples, shared by every board
+    MAP_INDEX = MapIndex(CITY_CONNECTIONS, CITY_COLORS, DISEASE_COLORS, PORT_CITIES, OUTBREAK_NEIGHBORS)
+    ZOBRIST_KEYS = ZobristKeys(MAP_INDEX, MAX_CUBES_PER_COLOR)
+    
     def __init__(self):   # Time Complexity: O(V + E)
         self.cities = list(self.CITY_CONNECTIONS.keys())
-
-        self.disease_cubes = {}
-        for city in self.cities:
-            self.disease_cubes[city] = {color: 0 for color in self.DISEASE_COLORS}
         
-        self.hospitals = {}
+        # Cubes live in a compact index-based core; this class is the name-based facade over it
+        self.core = BoardCore(self.MAP_INDEX, self.MAX_CUBES_PER_COLOR, self.ZOBRIST_KEYS)
+        
+        self.hospitals = {}              # color -> city (one hospital per color)
+        self._hospital_colors = {}       # city -> color, reverse index kept in step by build_hospital
+        self._structure_zobrist = 0      # hospitals and railroads; cubes are hashed by the core
         
         self.railroads = set()
         self.max_railroads = 20
         
         self._railroad_graph = Graph()
         self.update_railroad_graph()
-        
-        self.PORT_CITIES = {
-            'Albufeira', 'Lisboa', 'Porto', 'Vigo', 'Coruña', 'Gijon', 'Santander',
-            'San Sebastian', 'Barcelona', 'Tarragona', 'Valencia', 'Alicante',
-            'Cartagena', 'Almeria', 'Malaga', 'Gibraltar', 'Cadiz', 'Huelva', 'Mallorca'
-        }
+    
+    def clone(self): # Time Complexity: O(V × D + R) where R = railroads built
+        """
+        Independent copy for look-ahead search. The map tables are class attributes and
+        self.cities is never modified, so both are shared; only the mutable state is copied.
+        """
+        copy = Board.__new__(Board)
+        copy.cities = self.cities
+        copy.core = self.core.clone()
+        copy.hospitals = self.hospitals.copy()
+        copy._hospital_colors = self._hospital_colors.copy()
+        copy._structure_zobrist = self._structure_zobrist
+        copy.railroads = self.railroads.copy()
+        copy.max_railroads = self.max_railroads
+        copy.railroad_version = self.railroad_version
+        copy._movement_trees = self._movement_trees   # shared until either board builds a railroad
+        copy._railroad_graph = self._railroad_graph.clone()
+        copy._railroad_networks = self._copy_railroad_networks()
+        return copy
+
+    def _copy_railroad_networks(self): # Time Complexity: O(n) where n = cities on a railroad
+        # One new member list per network, still shared by all of that network's cities
+        networks = {}
+        for network in {id(network): network for network in self._railroad_networks.values()}.values():
+            network = network.copy()
+            for city in network:
+                networks[city] = network
+        return networks
+
+    def save_structures(self, railroads=False): # Time Complexity: O(1), O(V + R) with railroads=True
+        """
+        Undo point for build_hospital (and build_railroad when railroads=True); see restore_structures.
+        Hospitals are only ever appended, so their counts are enough; the railroad structures are copied.
+        """
+        saved_railroads = None
+        if railroads:
+            saved_railroads = (self.railroads.copy(), self._railroad_graph.clone(), self._copy_railroad_networks(),
+                               self.railroad_version, self._movement_trees)
+        return (len(self.hospitals), len(self._hospital_colors), self._structure_zobrist, saved_railroads)
+
+    def restore_structures(self, saved): # Time Complexity: O(1), O(1) swap of the saved railroad copies
+        hospital_count, hospital_city_count, structure_zobrist, saved_railroads = saved
+        while len(self.hospitals) > hospital_count:
+            self.hospitals.popitem()         # dicts pop the most recently built hospital
+        while len(self._hospital_colors) > hospital_city_count:
+            self._hospital_colors.popitem()
+        self._structure_zobrist = structure_zobrist
+        if saved_railroads is not None:
+            (self.railroads, self._railroad_graph, self._railroad_networks,
+             self.railroad_version, self._movement_trees) = saved_railroads
+
+    def __getstate__(self): # Time Complexity: O(V × D)
+        # Pickle only the mutable state: the map and Zobrist tables (~80 KB) are class attributes,
+        # so a worker process rebuilds them from its own import instead of receiving them per state
+        return (bytes(self.core.cubes), self.hospitals, self.railroads, self.max_railroads)
+
+    def __setstate__(self, state): # Time Complexity: O(V × D + R log V)
+        cubes, hospitals, railroads, max_railroads = state
+        self.__init__()
+        self.max_railroads = max_railroads
+        num_colors = self.MAP_INDEX.num_colors
+        for slot, count in enumerate(cubes):
+            if count:
+                self.core.add_cubes(slot // num_colors, slot % num_colors, count)
+        for color, city in hospitals.items():
+            self.build_hospital(city, color)
+        for city1, city2 in railroads:
+            self.build_railroad(city1, city2)
+
+    @property
+    def zobrist_hash(self): # Time Complexity: O(1)
+        return self.core.zobrist ^ self._structure_zobrist
+    
+    def compute_zobrist_hash(self): # Time Complexity: O(V × D + R)
+        # From-scratch recomputation of zobrist_hash, to check the incremental updates
+        keys = self.ZOBRIST_KEYS
+        index = self.MAP_INDEX
+        value = 0
+        for slot, count in enumerate(self.core.cubes):
+            value ^= keys.cube_delta(slot, 0, count)
+        for color, city in self.hospitals.items():
+            value ^= keys.hospital_keys[index.color_index[color] * index.num_cities + index.city_index[city]]
+        for railroad in self.railroads:
+            city1, city2 = railroad
+            value ^= keys.railroad_key(index.city_index[city1], index.city_index[city2])
+        return value
+    
+    @property
+    def disease_cubes(self): # Time Complexity: O(1)
+        # Read-only {city: {color: count}} view; change cubes through add_cubes / remove_cubes
+        return CubeMapView(self.core)
+    
+    def city_index(self, city): # Time Complexity: O(1)
+        return self.MAP_INDEX.city_index[city]
+    
+    def color_index(self, color): # Time Complexity: O(1)
+        return self.MAP_INDEX.color_index[color]
     
     def get_neighbors(self, city):    # Time Complexity: O(1)
         return self.CITY_CONNECTIONS.get(city, [])
     
-    def get_outbreak_neighbors(self, city):   # Time Complexity: O(degree)
-        regular_neighbors = self.CITY_CONNECTIONS.get(city, [])
-        outbreak_only     = self.OUTBREAK_ONLY_CONNECTIONS.get(city, [])
-        return list(set(regular_neighbors + outbreak_only))
+    def get_outbreak_neighbors(self, city):   # Time Complexity: O(1)
+        return self.OUTBREAK_NEIGHBORS.get(city, ())
     
-    def get_cubes_on_board(self, color): # Time Complexity: O(V)
-        total = 0
-        for city in self.cities:
-            total += self.disease_cubes[city][color]
-        return total
+    def spread_outbreak(self, city, color, outbreak_limit):   # Time Complexity: O(k × degree) where k = cities reached
+        # Returns: (outbreaks in the chain, supply_exhausted), see BoardCore.spread_outbreak
+        return self.core.spread_outbreak(self.MAP_INDEX.city_index[city], self.MAP_INDEX.color_index[color], outbreak_limit)
     
-    def get_cube_supply_remaining(self, color): # Time Complexity: O(V)
-        return max(0, self.MAX_CUBES_PER_COLOR - self.get_cubes_on_board(color))
+    def get_cubes_on_board(self, color): # Time Complexity: O(1)
+        return self.core.cubes_on_board[self.MAP_INDEX.color_index[color]]
     
-    def add_cubes(self, city, color, count):   # Time Complexity: O(V)
-        supply_remaining = self.get_cube_supply_remaining(color)
-        if supply_remaining <= 0:
-            return 0
-        cubes_to_add = min(count, supply_remaining)
-        self.disease_cubes[city][color] += cubes_to_add
-        return cubes_to_add
+    def get_cube_supply_remaining(self, color): # Time Complexity: O(1)
+        return self.core.get_supply_remaining(self.MAP_INDEX.color_index[color])
+    
+    def add_cubes(self, city, color, count):   # Time Complexity: O(1)
+        return self.core.add_cubes(self.MAP_INDEX.city_index[city], self.MAP_INDEX.color_index[color], count)
     
     def remove_cubes(self, city, color, count): # Time Complexity: O(1)
-        current = self.disease_cubes[city][color]
-        removed = min(count, current)
-        self.disease_cubes[city][color] -= removed
-        return removed
+        return self.core.remove_cubes(self.MAP_INDEX.city_index[city], self.MAP_INDEX.color_index[color], count)
     
     def get_cube_count(self, city, color): # Time Complexity: O(1)
-        return self.disease_cubes[city].get(color, 0)
+        color_idx = self.MAP_INDEX.color_index.get(color)
+        if color_idx is None:
+            return 0
+        return self.core.get_cube_count(self.MAP_INDEX.city_index[city], color_idx)
+    
+    def get_city_cubes(self, city): # Time Complexity: O(D)
+        # Cube counts of one city as a tuple, in DISEASE_COLORS order
+        return self.core.get_city_cubes(self.MAP_INDEX.city_index[city])
+    
+    def get_cities_with_cube_count(self, count, color=None): # Time Complexity: O(D + T) where T = number of matching cities
+        # Cities holding exactly `count` cubes of `color` (of any color when None), in MAP_INDEX order
+        city_names = self.MAP_INDEX.city_names
+        if color is None:
+            return [city_names[city] for city in self.core.cities_with_cube_count(count)]
+        color_idx = self.MAP_INDEX.color_index.get(color)
+        if color_idx is None:
+            return []
+        return [city_names[city] for city in mask_to_indices(self.core.level_mask(color_idx, count))]
+    
+    def get_outbreak_risk_cities(self): # Time Complexity: O(D + T) where T = number of 3-cube cities
+        # Cities one infection draw away from an outbreak (3 cubes of their own color), in MAP_INDEX order
+        city_names = self.MAP_INDEX.city_names
+        return [city_names[city] for city in self.core.outbreak_risk_cities()]
+    
+    def has_hospital(self, city): # Time Complexity: O(1)
+        return city in self._hospital_colors
     
-    def has_hospital(self, city): # Time Complexity: O(1) (D = 4, constant)
-        return city in self.hospitals.values()
+    def get_hospital_color(self, city): # Time Complexity: O(1)
+        return self._hospital_colors.get(city)
     
-    def get_hospital_color(self, city): # Time Complexity: O(1) (D = 4, constant) 
-        for color, hospital_city in self.hospitals.items():
-            if hospital_city == city:
-                return color
-        return None
+    def get_hospital_city(self, color): # Time Complexity: O(1)
+        return self.hospitals.get(color)
     
     def build_hospital(self, city, color): # Time Complexity: O(1)
         if color in self.hospitals:
             return False 
         self.hospitals[color] = city
+        self._structure_zobrist ^= self.ZOBRIST_KEYS.hospital_keys[
+            self.MAP_INDEX.color_index[color] * self.MAP_INDEX.num_cities + self.MAP_INDEX.city_index[city]]
+        # setdefault: a city given a second hospital keeps reporting the first one's color
+        self._hospital_colors.setdefault(city, color)
         return True
     
     def has_railroad(self, city1, city2): # Time Complexity: O(degree) where degree = number of railroad neighbors
         return self._railroad_graph.has_edge(city1, city2)
     
-    def build_railroad(self, city1, city2): # Time Complexity: O(V + E)
+    def build_railroad(self, city1, city2): # Time Complexity: O(min(n1, n2)) for the network merge, O(log V) amortized per city
         if len(self.railroads) >= self.max_railroads:
             return False
         if self._railroad_graph.has_edge(city1, city2):
             return False
         pair = frozenset([city1, city2])
         self.railroads.add(pair)
-        self.update_railroad_graph()
+        self._structure_zobrist ^= self.ZOBRIST_KEYS.railroad_key(self.MAP_INDEX.city_index[city1], self.MAP_INDEX.city_index[city2])
+        self._railroad_graph.add_edge(city1, city2)
+        self._merge_railroad_networks(city1, city2)
+        self.railroad_version = next(_railroad_versions)
+        self._movement_trees = {}   # a new dict: clones still hold the old one, valid for their network
         return True
     
+    def _merge_railroad_networks(self, city1, city2): # Time Complexity: O(min(n1, n2)) where n1, n2 = network sizes
+        # Every city of a network maps to the same member list; the smaller list is folded into
+        # the larger one, so each city is moved O(log V) times over a whole game
+        networks = self._railroad_networks
+        network1 = networks.setdefault(city1, [city1])
+        network2 = networks.setdefault(city2, [city2])
+        if network1 is network2:
+            return
+        if len(network1) < len(network2):
+            network1, network2 = network2, network1
+        network1.extend(network2)
+        for city in network2:
+            networks[city] = network1
+    
     def update_railroad_graph(self): # Time Complexity: O(V + E)
-        self._railroad_graph = Graph()
-        for city in self.cities:
-            self._railroad_graph.add_vertex(city)
+        # Full rebuild from self.railroads; build_railroad keeps both structures up to date incrementally
+        # Only cities touched by a railroad get an entry in either structure; most games build few
+        self._railroad_graph = Graph()   # the railroad edges themselves
+        self._railroad_networks = {}     # city -> list of the cities on its railroad network (connectivity)
+        # source city -> movement tree for this railroad_version; boards without railroads share one cache
+        if self.railroads:
+            self.railroad_version = next(_railroad_versions)
+            self._movement_trees = {}
+        else:
+            self.railroad_version = 0
+            self._movement_trees = self._EMPTY_NETWORK_MOVEMENT_TREES
         for city in self.cities:
             for neighbor in self.get_neighbors(city):
                 if frozenset([city, neighbor]) in self.railroads:
                     self._railroad_graph.add_edge(city, neighbor)
+                    self._merge_railroad_networks(city, neighbor)
+    
+    def is_connected_by_railroad(self, city1, city2): # Time Complexity: O(1)
+        # True when a train can travel from city1 to city2: both map to the same network member list
+        network = self._railroad_networks.get(city1)
+        return city1 != city2 and network is not None and network is self._railroad_networks.get(city2)
+    
+    def _get_movement_tree(self, city): # Time Complexity: O(1) when cached, O(V + E) otherwise
+        # (distance, previous) from movement.compute_movement_tree, computed once per source and railroad_version
+        tree = self._movement_trees.get(city)
+        if tree is None:
+            tree = self._movement_trees[city] = compute_movement_tree(self, city)
+        return tree
+    
+    def get_distance_field(self, city): # Time Complexity: O(1) when cached, O(V + E) otherwise
+        # Fewest move actions from `city` to every reachable city, mixing carriage, train and ship.
+        # Shared state: read it, do not modify it
+        return self._get_movement_tree(city)[0]
+    
+    def get_movement_path(self, start, end): # Time Complexity: O(d) when cached, O(V + E) otherwise
+        # One of the shortest mixed-mode routes [start, ..., end], one move action per step; None if unreachable
+        return trace_movement_path(self._get_movement_tree(start)[1], start, end)
+    
+    def get_railroad_network(self, city): # Time Complexity: O(1)
+        # Cities reachable from `city` by train, itself included; empty when no railroad touches it.
+        # The list is shared board state: read it, do not modify it
+        return self._railroad_networks.get(city, ())
+    
+    def get_railroad_neighbors(self, city): # Time Complexity: O(1)
+        return self._railroad_graph.get_neighbors(city)
     
     def get_railroad_graph(self): # Time Complexity: O(V + E)
-        return self._railroad_graph.get_adjacency_list()
+        # Every city is listed, with an empty list when no railroad reaches it
+        return {city: list(self._railroad_graph.get_neighbors(city)) for city in self.cities}
     
     def get_railroads_remaining(self): # Time Complexity: O(1)
         return self.max_railroads - len(self.railroads)
@@ -0,0 +1,268 @@
+def mask_to_indices(mask):   # Time Complexity: O(k) where k = number of set bits
+    # Positions of the set bits of `mask`, lowest first
+    indices = []
+    while mask:
+        lowest = mask & -mask
+        indices.append(lowest.bit_length() - 1)
+        mask ^= lowest
+    return indices
+
+
+class MapIndex:
+    """
+    Integer view of the static map: cities are numbered 0..V-1 and colors 0..D-1,
+    in the order they appear in the name-keyed tables it is built from.
+    Everything here is immutable and shared by every board.
+    """
+    def __init__(self, city_connections, city_colors, disease_colors, port_cities, outbreak_connections):  # Time Complexity: O(V + E)
+        self.city_names  = tuple(city_connections)
+        self.city_index  = {city: i for i, city in enumerate(self.city_names)}
+        self.color_names = tuple(disease_colors)
+        self.color_index = {color: i for i, color in enumerate(self.color_names)}
+
+        self.num_cities = len(self.city_names)
+        self.num_colors = len(self.color_names)
+
+        self.city_colors = tuple(self.color_index[city_colors[city]] for city in self.city_names)
+        self.neighbors   = tuple(
+            tuple(self.city_index[neighbor] for neighbor in city_connections[city])
+            for city in self.city_names
+        )
+        self.outbreak_neighbors = tuple(
+            tuple(self.city_index[neighbor] for neighbor in outbreak_connections[city])
+            for city in self.city_names
+        )
+        # Same adjacency as one integer per city, bit i set = city i is an outbreak neighbor
+        self.outbreak_masks = tuple(sum(1 << neighbor for neighbor in neighbors) for neighbors in self.outbreak_neighbors)
+        # Cities of each color as one integer, bit i set = city i has that color
+        self.color_masks = tuple(sum(1 << city for city, city_color in enumerate(self.city_colors) if city_color == color)
+                                 for color in range(self.num_colors))
+        self.is_port      = tuple(city in port_cities for city in self.city_names)
+        self.port_indices = tuple(i for i, port in enumerate(self.is_port) if port)
+
+
+class BoardCore:
+    """
+    Compact cube storage: one contiguous byte per (city, color) pair, at city * num_colors + color.
+    All arguments are indices from a MapIndex; Board wraps this with the name-based API.
+    zobrist is the XOR of the cube keys of every slot (see zobrist.ZobristKeys), kept up to date on each change.
+    journal: None, or a list that every cube change appends (slot, old_count) to (see undo_cube_changes).
+    level_masks[(level - 1) * num_colors + color]: bit i set = city i holds exactly `level` cubes of `color`
+    (level ≥ 1), flipped on each change so cube-level queries cost O(answer size) instead of a board scan.
+    """
+    def __init__(self, map_index, max_cubes_per_color, zobrist_keys):  # Time Complexity: O(V × D)
+        self.map_index  = map_index
+        self.num_colors = map_index.num_colors
+        self.max_cubes_per_color = max_cubes_per_color
+        self.cubes = bytearray(map_index.num_cities * map_index.num_colors)
+        self.cubes_on_board = [0] * map_index.num_colors
+        self.zobrist_keys = zobrist_keys
+        self.zobrist = 0
+        self.journal = None
+        self.level_masks = [0] * (3 * self.num_colors)   # levels 1..3, grown on demand
+
+    def clone(self):   # Time Complexity: O(V × D) bytes copied
+        # Shares the immutable MapIndex, copies the cube bytes and counters
+        copy = BoardCore.__new__(BoardCore)
+        copy.map_index  = self.map_index
+        copy.num_colors = self.num_colors
+        copy.max_cubes_per_color = self.max_cubes_per_color
+        copy.cubes = bytearray(self.cubes)
+        copy.cubes_on_board = self.cubes_on_board.copy()
+        copy.zobrist_keys = self.zobrist_keys
+        copy.zobrist = self.zobrist
+        copy.journal = None
+        copy.level_masks = self.level_masks.copy()
+        return copy
+    
+    def get_cube_count(self, city, color):   # Time Complexity: O(1)
+        return self.cubes[city * self.num_colors + color]
+
+    def get_city_cubes(self, city):   # Time Complexity: O(D)
+        start = city * self.num_colors
+        return tuple(self.cubes[start:start + self.num_colors])
+
+    def get_supply_remaining(self, color):   # Time Complexity: O(1)
+        return max(0, self.max_cubes_per_color - self.cubes_on_board[color])
+
+    def _move_level(self, city, color, old_count, new_count):   # Time Complexity: O(1) amortized
+        # Moves the bit of `city` between the level masks of `color`; level 0 is implicit (not stored)
+        masks = self.level_masks
+        bit = 1 << city
+        if old_count:
+            masks[(old_count - 1) * self.num_colors + color] ^= bit
+        if new_count:
+            slot = (new_count - 1) * self.num_colors + color
+            if slot >= len(masks):
+                masks.extend([0] * (slot + self.num_colors - color - len(masks)))
+            masks[slot] ^= bit
+
+    def add_cubes(self, city, color, count):   # Time Complexity: O(1)
+        supply_remaining = self.max_cubes_per_color - self.cubes_on_board[color]
+        if supply_remaining <= 0:
+            return 0
+        cubes_to_add = min(count, supply_remaining)
+        slot = city * self.num_colors + color
+        old_count = self.cubes[slot]
+        if self.journal is not None:
+            self.journal.append((slot, old_count))
+        self.cubes[slot] = old_count + cubes_to_add
+        self.cubes_on_board[color] += cubes_to_add
+        if cubes_to_add:
+            self._move_level(city, color, old_count, old_count + cubes_to_add)
+        keys = self.zobrist_keys
+        base = slot * keys.cube_levels
+        self.zobrist ^= keys.cube_keys[base + old_count] ^ keys.cube_keys[base + old_count + cubes_to_add]
+        return cubes_to_add
+
+    def remove_cubes(self, city, color, count):   # Time Complexity: O(1)
+        slot = city * self.num_colors + color
+        old_count = self.cubes[slot]
+        if self.journal is not None:
+            self.journal.append((slot, old_count))
+        removed = min(count, old_count)
+        self.cubes[slot] = old_count - removed
+        self.cubes_on_board[color] -= removed
+        if removed:
+            self._move_level(city, color, old_count, old_count - removed)
+        keys = self.zobrist_keys
+        base = slot * keys.cube_levels
+        self.zobrist ^= keys.cube_keys[base + old_count] ^ keys.cube_keys[base + old_count - removed]
+        return removed
+
+    def undo_cube_changes(self, changes):   # Time Complexity: O(k) where k = len(changes)
+        # Rolls back journal entries (slot, old_count), newest first, counters and hash included
+        keys = self.zobrist_keys
+        num_colors = self.num_colors
+        for slot, old_count in reversed(changes):
+            count = self.cubes[slot]
+            self.cubes[slot] = old_count
+            self.cubes_on_board[slot % num_colors] += old_count - count
+            if count != old_count:
+                self._move_level(slot // num_colors, slot % num_colors, count, old_count)
+            base = slot * keys.cube_levels
+            self.zobrist ^= keys.cube_keys[base + count] ^ keys.cube_keys[base + old_count]
+
+    def spread_outbreak(self, city, color, outbreak_limit):   # Time Complexity: O(k × D') where k = cities reached, D' = max outbreak degree
+        """
+        Resolves the outbreak chain started by `city`, one BFS level at a time:
+        the frontier and the visited set are integer bitmasks, expanded by OR-ing neighbor masks.
+        Neighbors below 3 cubes get one cube (while supply lasts), the others join the next frontier.
+        outbreak_limit: outbreaks allowed before the game is lost; the chain stops when it is reached
+        Returns: (outbreaks in the chain, supply_exhausted)
+        """
+        masks = self.map_index.outbreak_masks
+        cubes = self.cubes
+        num_colors = self.num_colors
+        cube_keys  = self.zobrist_keys.cube_keys
+        levels     = self.zobrist_keys.cube_levels
+        journal    = self.journal
+        level_masks = self.level_masks
+        visited  = 1 << city
+        frontier = visited
+        outbreaks = 1
+        supply_exhausted = False
+
+        while frontier:
+            if outbreaks >= outbreak_limit:
+                return outbreak_limit, supply_exhausted
+            reached = 0
+            while frontier:
+                lowest = frontier & -frontier
+                reached |= masks[lowest.bit_length() - 1]
+                frontier ^= lowest
+            reached &= ~visited
+            visited |= reached
+
+            while reached:
+                lowest = reached & -reached
+                reached ^= lowest
+                slot = (lowest.bit_length() - 1) * num_colors + color
+                if cubes[slot] >= 3:
+                    outbreaks += 1
+                    if outbreaks >= outbreak_limit:
+                        return outbreak_limit, supply_exhausted
+                    frontier |= lowest
+                elif self.cubes_on_board[color] < self.max_cubes_per_color:
+                    count = cubes[slot]
+                    if journal is not None:
+                        journal.append((slot, count))
+                    cubes[slot] = count + 1
+                    self.cubes_on_board[color] += 1
+                    if count:
+                        level_masks[(count - 1) * num_colors + color] ^= lowest
+                    level_masks[count * num_colors + color] ^= lowest   # count < 3, so levels 1..3 only
+                    key = slot * levels + count
+                    self.zobrist ^= cube_keys[key] ^ cube_keys[key + 1]
+                else:
+                    supply_exhausted = True
+        return outbreaks, supply_exhausted
+
+    def level_mask(self, color, count):   # Time Complexity: O(1)
+        # Bitmask of the cities holding exactly `count` (≥ 1) cubes of `color`
+        slot = (count - 1) * self.num_colors + color
+        return self.level_masks[slot] if 0 < count and slot < len(self.level_masks) else 0
+
+    def cities_with_cube_count(self, count):   # Time Complexity: O(D + T) where T = number of matching cities
+        # City indices holding exactly `count` (≥ 1) cubes of at least one color, in index order
+        mask = 0
+        for color in range(self.num_colors):
+            mask |= self.level_mask(color, count)
+        return mask_to_indices(mask)
+
+    def outbreak_risk_cities(self):   # Time Complexity: O(D + T) where T = number of 3-cube cities
+        # City indices at 3 cubes of their own color: drawing their infection card causes an outbreak
+        color_masks = self.map_index.color_masks
+        mask = 0
+        for color in range(self.num_colors):
+            mask |= self.level_mask(color, 3) & color_masks[color]
+        return mask_to_indices(mask)
+
+
+class CityCubesView:
+    # Read-only {color: count} view of one city, for code written against the old dict of dicts
+    def __init__(self, core, city):  # Time Complexity: O(1)
+        self._core = core
+        self._city = city
+
+    def __getitem__(self, color):   # Time Complexity: O(1)
+        return self._core.get_cube_count(self._city, self._core.map_index.color_index[color])
+
+    def get(self, color, default=0):   # Time Complexity: O(1)
+        color_idx = self._core.map_index.color_index.get(color)
+        if color_idx is None:
+            return default
+        return self._core.get_cube_count(self._city, color_idx)
+
+    def items(self):   # Time Complexity: O(D)
+        return list(zip(self._core.map_index.color_names, self._core.get_city_cubes(self._city)))
+
+    def keys(self):   # Time Complexity: O(D)
+        return list(self._core.map_index.color_names)
+
+    def values(self):   # Time Complexity: O(D)
+        return list(self._core.get_city_cubes(self._city))
+
+    def __iter__(self):   # Time Complexity: O(D)
+        return iter(self._core.map_index.color_names)
+
+    def __len__(self):   # Time Complexity: O(1)
+        return self._core.num_colors
+
+
+class CubeMapView:
+    # Read-only {city: {color: count}} view over a BoardCore
+    def __init__(self, core):  # Time Complexity: O(1)
+        self._core = core
+
+    def __getitem__(self, city):   # Time Complexity: O(1)
+        return CityCubesView(self._core, self._core.map_index.city_index[city])
+
+    def __contains__(self, city):   # Time Complexity: O(1)
+        return city in self._core.map_index.city_index
+
+    def __iter__(self):   # Time Complexity: O(V)
+        return iter(self._core.map_index.city_names)
+
+    def __len__(self):   # Time Complexity: O(1)
+        return self._core.map_index.num_cities
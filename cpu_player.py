@@ -1,6 +1,4 @@
-import random
 from algorithms import greedy_select
-from board import bfs_shortest_path
 
 
 def choose_starting_city_for_cpu(game_state, player):   # Time Complexity: O(H)
@@ -28,38 +26,50 @@ def choose_starting_city_for_cpu(game_state, player):   # Time Complexity: O(H)
             score -= 1000
         return score
     
+    # Sorted so that tie-breaking does not depend on set iteration order (hash seed)
     best_candidates = greedy_select(
-        player.hand,
+        sorted(player.hand),
         score_func = lambda city: score_city(city, p1_color),
         maximize   = True,
-        tie_breaker = random.choice,
+        tie_breaker = game_state.rng.choice,
     )
     
     return best_candidates
 
 
-def calculate_movement_cost(board, current_city, target_city):   # Time Complexity: O(V + E)
-    if current_city is None or target_city is None:
-        return None
-    if current_city == target_city:
-        return (0, [current_city])
-    if board.is_port_city(current_city) and board.is_port_city(target_city):
-        return (1, [current_city, target_city])
+def choose_cpu_discard(game_state, player):   # Time Complexity: O(H)
+    board = game_state.board
+    hand = sorted(player.hand)
+    color_counts = {}
+    for card in hand:
+        color = board.get_city_color(card)
+        if color is not None:
+            color_counts[color] = color_counts.get(color, 0) + 1
     
-    rr_graph = board.get_railroad_graph()
-    if rr_graph:
-        path = bfs_shortest_path(rr_graph, current_city, target_city)
-        if path:
-            return (1, path)
+    if not color_counts:
+        # Fallback: discard first card if no valid colors found
+        return hand[0] if hand else None
     
-    full_graph = board.CITY_CONNECTIONS
-    path = bfs_shortest_path(full_graph, current_city, target_city)
-    if path:
-        cost = len(path) - 1
-        return (cost, path)
-    return None
+    min_count = min(color_counts.values())
+    min_colors = [color for color, count in color_counts.items() if count == min_count]
+    min_color = game_state.rng.choice(min_colors)
+    for card in hand:
+        if board.get_city_color(card) == min_color:
+            return card
+    # Fallback if no card matches
+    return hand[0] if hand else None
+
+
+def calculate_movement_cost(board, current_city, target_city):   # Time Complexity: O(d) from the cached movement tree, O(V + E) to build it
+    # Fewest move actions and one route achieving it, mixing carriage, train and ship (see Board.get_movement_path)
+    if current_city is None or target_city is None:
+        return None
+    path = board.get_movement_path(current_city, target_city)
+    if path is None:
+        return None
+    return (len(path) - 1, path)
 
-def can_reach_in_moves(board, current_city, target_city, max_moves):   # Time Complexity: O(V + E)
+def can_reach_in_moves(board, current_city, target_city, max_moves):   # Time Complexity: O(d) from the cached movement tree, O(V + E) to build it
     result = calculate_movement_cost(board, current_city, target_city)
     if result is None:
         return (False, None, None)
@@ -68,19 +78,14 @@ def can_reach_in_moves(board, current_city, target_city, max_moves):   # Time Co
     return (cost <= max_moves, cost, path)
 
 
-def get_next_step_towards_target(board, current_city, target_city):   # Time Complexity: O(V + E)
-    result = calculate_movement_cost(board, current_city, target_city)
-    if result is None:
+def get_next_step_towards_target(board, current_city, target_city):   # Time Complexity: O(d) from the cached movement tree, O(V + E) to build it
+    if current_city is None or target_city is None or current_city == target_city:
         return None
-    cost, path = result
-    if len(path) < 2:
-        return None 
-    return path[1]
+    path = board.get_movement_path(current_city, target_city)
+    return path[1] if path else None
 
 def is_city_connected_by_railroad(board, city): # Time Complexity: O(1) - dictionary lookup and length check
-    rr_graph = board.get_railroad_graph()
-    neighbors = rr_graph.get(city, [])
-    return len(neighbors) > 0
+    return len(board.get_railroad_neighbors(city)) > 0
 
 def find_research_target_with_check(board, player, game_state): # Time Complexity: O(H + D)
     counts = {}
@@ -100,14 +105,15 @@ def find_research_target_with_check(board, player, game_state): # Time Complexit
                     options.append((color, board.hospitals[color]))
     
     if len(options) > 0:
-        return random.choice(options)
+        return game_state.rng.choice(options)
     return None, None
 
-def find_hospital_build_target_prioritized(board, player, current_city): # Time Complexity: O(H × (V + E))
+def find_hospital_build_target_prioritized(board, player, current_city): # Time Complexity: O(H log H) with the cached distance field, O(V + E) to build it
     port_cities_with_cost = []
     railroad_cities_with_cost = []
+    distance = board.get_distance_field(current_city) if current_city is not None else {}
     
-    for card in player.hand:
+    for card in sorted(player.hand):
         city = card
         color = board.get_city_color(city)
         if not color:
@@ -115,11 +121,10 @@ def find_hospital_build_target_prioritized(board, player, current_city): # Time
         if color in board.hospitals:
             continue
         
-        result = calculate_movement_cost(board, current_city, city)
-        if result is None:
+        cost = distance.get(city)
+        if cost is None:
             continue
         
-        cost, _ = result
         if cost > 3:
             continue
         
@@ -138,38 +143,33 @@ def find_hospital_build_target_prioritized(board, player, current_city): # Time
     
     return None
 
-def find_three_cube_target_with_cost(board, current_city, max_moves=3): # Time Complexity: O(V + T × (V + E))
+def find_three_cube_target_with_cost(board, current_city, max_moves=3): # Time Complexity: O(D + T) where T = number of 3-cube cities, plus O(V + E) once per distance field
     if current_city is None:
         return (None, None)
-    targets = set()
-    for city in board.cities:
-        for color in board.DISEASE_COLORS:
-            if board.get_cube_count(city, color) == 3:
-                targets.add(city)
-                break
     
-    if current_city in targets:
-        targets.remove(current_city)
+    # Candidates come in MAP_INDEX order, which breaks ties between equally close targets
+    targets = board.get_cities_with_cube_count(3)
     if not targets:
         return (None, None)
     
+    distance = board.get_distance_field(current_city)
     reachable = []
     for city in targets:
-        can_reach, cost, _ = can_reach_in_moves(board, current_city, city, max_moves)
-        if can_reach:
+        cost = distance.get(city)
+        if city != current_city and cost is not None and cost <= max_moves:
             reachable.append((city, cost))
     if not reachable:
         return (None, None)
     best = min(reachable, key=lambda x: x[1])
     return best
-def choose_cpu_action(game_state, player): # Time Complexity: O((H + V) × (V + E))
+def choose_cpu_action(game_state, player): # Time Complexity: O(H log H + V) with cached movement trees, plus O(V + E) per new source city
     board = game_state.board
     current = player.location
     
     if current is None:
         # Player has no location - try to move to first available city
         if player.hand:
-            return ("move", next(iter(player.hand)))
+            return ("move", min(player.hand))
         return ("skip", None)
 
     if player.cpu_committed_plan is not None:
@@ -273,13 +273,13 @@ def choose_cpu_action(game_state, player): # Time Complexity: O((H + V) × (V +
                 player.cpu_committed_plan = None
     
     valid_hospital_cities = []
-    for card in player.hand:
+    distance = board.get_distance_field(current)
+    for card in sorted(player.hand):
         city = card
         color = board.get_city_color(city)
         if color and color not in board.hospitals:
-            result = calculate_movement_cost(board, current, city)
-            if result:
-                cost, _ = result
+            cost = distance.get(city)
+            if cost is not None:
                 valid_hospital_cities.append((city, cost))
     
     if valid_hospital_cities:
@@ -317,11 +317,26 @@ def choose_cpu_action(game_state, player): # Time Complexity: O((H + V) × (V +
     
     neighbors = board.get_neighbors(current)
     if neighbors:
-        return ("move", random.choice(neighbors))
+        return ("move", game_state.rng.choice(neighbors))
     
     if board.is_port_city(current):
-        port_cities = [city for city in board.PORT_CITIES if city != current]
+        port_cities = [city for city in board.PORT_CITIES_SORTED if city != current]
         if port_cities:
-            return ("move", random.choice(port_cities))
+            return ("move", game_state.rng.choice(port_cities))
+    
+    return ("skip", None)
+
+
+class GreedyCpuPolicy:
+    """
+    Pluggable CPU policy used by PandemicTextGame and the headless engine.
+    Any object with these three methods can stand in for it.
+    """
+    def choose_starting_city(self, game_state, player):   # Time Complexity: O(H)
+        return choose_starting_city_for_cpu(game_state, player)
+    
+    def choose_action(self, game_state, player):   # Time Complexity: O(H log H + V) with cached movement trees, see choose_cpu_action
+        return choose_cpu_action(game_state, player)
     
-    return ("skip", None)
\ No newline at end of file
+    def choose_discard(self, game_state, player):   # Time Complexity: O(H)
+        return choose_cpu_discard(game_state, player)
@@ -1,24 +1,66 @@
+from collections import deque
+from itertools import islice
+
+
 class Node:
+    __slots__ = ('value', 'next')
+    
     def __init__(self, value, next=None):  # Time Complexity: O(1)
         self.value = value
         self.next  = next
 
-class Stack:
+class NodePool:
+    """
+    Free list of Nodes. A Stack or Queue given a pool takes its nodes from here and hands
+    them back when cards leave, so long simulations stop allocating a Node per card move.
+    One pool can be shared by every container of a game (or of a worker process).
+    """
+    __slots__ = ('free',)
+    
     def __init__(self):  # Time Complexity: O(1)
+        self.free = []
+    
+    def acquire(self, value, next=None):   # Time Complexity: O(1)
+        if self.free:
+            node = self.free.pop()
+            node.value = value
+            node.next  = next
+            return node
+        return Node(value, next)
+    
+    def release(self, node):   # Time Complexity: O(1)
+        node.value = None
+        node.next  = None
+        self.free.append(node)
+    
+    def __len__(self):    # Time Complexity: O(1)
+        return len(self.free)
+
+class Stack:
+    __slots__ = ('top', 'size', 'pool')
+    
+    def __init__(self, pool=None):  # Time Complexity: O(1)
         self.top  = None
         self.size = 0
+        self.pool = pool
     
     def push(self, value):   # Time Complexity: O(1)
-        node = Node(value, self.top)
+        if self.pool is None:
+            node = Node(value, self.top)
+        else:
+            node = self.pool.acquire(value, self.top)
         self.top = node
         self.size += 1
     
     def pop(self):   # Time Complexity: O(1)
         if self.is_empty():
             return None
-        value = self.top.value
-        self.top  = self.top.next
+        node = self.top
+        value = node.value
+        self.top  = node.next
         self.size -= 1
+        if self.pool is not None:
+            self.pool.release(node)
         return value
     
     def is_empty(self):   # Time Complexity: O(1)
@@ -26,15 +68,62 @@ class Stack:
     
     def __len__(self):    # Time Complexity: O(1)
         return self.size
+    
+    def __iter__(self):   # Time Complexity: O(n), top card first (pop order)
+        node = self.top
+        while node is not None:
+            yield node.value
+            node = node.next
+    
+    def peek_top(self, k):   # Time Complexity: O(k)
+        return list(islice(self, k))
+    
+    def peek_bottom(self, k):   # Time Complexity: O(n), a singly linked stack is only reachable from the top
+        # Last k cards in iteration order (the bottom card comes last)
+        if k <= 0:
+            return []
+        return list(deque(self, maxlen=k))
+    
+    def snapshot(self):   # Time Complexity: O(n)
+        # Immutable copy in iteration order; the stack itself is left untouched
+        return tuple(self)
+    
+    def clear(self):   # Time Complexity: O(1), O(n) when nodes go back to a pool
+        if self.pool is not None:
+            while self.top is not None:
+                node = self.top
+                self.top = node.next
+                self.pool.release(node)
+        self.top  = None
+        self.size = 0
+    
+    def restore(self, values):   # Time Complexity: O(n)
+        # Inverse of snapshot(): afterwards the stack holds exactly `values`, top card first
+        self.clear()
+        for value in reversed(values):
+            self.push(value)
+    
+    def clone(self):   # Time Complexity: O(n)
+        # Independent copy with fresh nodes (same pool, if any); the values are shared
+        copy = Stack(self.pool)
+        node = None
+        for value in reversed(self.snapshot()):
+            node = Node(value, node)
+        copy.top  = node
+        copy.size = self.size
+        return copy
 
 class Queue:
-    def __init__(self):  # Time Complexity: O(1)
+    __slots__ = ('head', 'tail', 'size', 'pool')
+    
+    def __init__(self, pool=None):  # Time Complexity: O(1)
         self.head = None
         self.tail = None
         self.size = 0
+        self.pool = pool
     
     def enqueue(self, value):   # Time Complexity: O(1)
-        node = Node(value)
+        node = Node(value) if self.pool is None else self.pool.acquire(value)
         if self.is_empty():
             self.head = node
         else:
@@ -45,11 +134,14 @@ class Queue:
     def dequeue(self):   # Time Complexity: O(1)
         if self.is_empty():
             return None
-        value = self.head.value
-        self.head = self.head.next
+        node = self.head
+        value = node.value
+        self.head = node.next
         if self.head is None:
             self.tail = None
         self.size -= 1
+        if self.pool is not None:
+            self.pool.release(node)
         return value
     
     def is_empty(self):   # Time Complexity: O(1)
@@ -57,8 +149,112 @@ class Queue:
     
     def __len__(self):    # Time Complexity: O(1)
         return self.size
+    
+    def __iter__(self):   # Time Complexity: O(n), head first (dequeue order)
+        node = self.head
+        while node is not None:
+            yield node.value
+            node = node.next
+    
+    def peek_top(self, k):   # Time Complexity: O(k)
+        return list(islice(self, k))
+    
+    def peek_bottom(self, k):   # Time Complexity: O(n), a singly linked queue is only walkable from the head
+        # Last k cards in iteration order (the tail comes last)
+        if k <= 0:
+            return []
+        return list(deque(self, maxlen=k))
+    
+    def snapshot(self):   # Time Complexity: O(n)
+        return tuple(self)
+    
+    def clear(self):   # Time Complexity: O(1), O(n) when nodes go back to a pool
+        if self.pool is not None:
+            while self.head is not None:
+                node = self.head
+                self.head = node.next
+                self.pool.release(node)
+        self.head = None
+        self.tail = None
+        self.size = 0
+    
+    def restore(self, values):   # Time Complexity: O(n)
+        # Inverse of snapshot(): afterwards the queue holds exactly `values`, head first
+        self.clear()
+        for value in values:
+            self.enqueue(value)
+    
+    def clone(self):   # Time Complexity: O(n)
+        copy = Queue(self.pool)
+        for value in self:
+            copy.enqueue(value)
+        return copy
+
+class Deck:
+    """
+    Card deck with the Queue interface (enqueue to the bottom, dequeue from the top),
+    plus O(1) draws from the bottom and pushing a batch of cards onto the top.
+    Backed by collections.deque, so no per-card node allocation.
+    """
+    __slots__ = ('cards',)
+    
+    def __init__(self, cards=()):  # Time Complexity: O(n)
+        self.cards = deque(cards)
+    
+    def enqueue(self, value):   # Time Complexity: O(1)
+        self.cards.append(value)
+    
+    def dequeue(self):   # Time Complexity: O(1)
+        if not self.cards:
+            return None
+        return self.cards.popleft()
+    
+    def draw_bottom(self):   # Time Complexity: O(1)
+        if not self.cards:
+            return None
+        return self.cards.pop()
+    
+    def push_top_many(self, values):   # Time Complexity: O(k) where k = len(values)
+        # values[0] ends up as the new top card
+        self.cards.extendleft(reversed(values))
+    
+    def is_empty(self):   # Time Complexity: O(1)
+        return not self.cards
+    
+    def __len__(self):    # Time Complexity: O(1)
+        return len(self.cards)
+    
+    def __iter__(self):   # Time Complexity: O(n), top card first
+        return iter(self.cards)
+    
+    def peek_top(self, k):   # Time Complexity: O(k)
+        return list(islice(self.cards, k))
+    
+    def peek_bottom(self, k):   # Time Complexity: O(k)
+        # Last k cards in iteration order (the bottom card comes last)
+        if k <= 0:
+            return []
+        return list(islice(reversed(self.cards), k))[::-1]
+    
+    def snapshot(self):   # Time Complexity: O(n)
+        return tuple(self.cards)
+    
+    def clear(self):   # Time Complexity: O(n)
+        self.cards.clear()
+    
+    def restore(self, values):   # Time Complexity: O(n)
+        # Inverse of snapshot(): afterwards the deck holds exactly `values`, top card first
+        self.cards.clear()
+        self.cards.extend(values)
+    
+    def clone(self):   # Time Complexity: O(n), a single C-level deque copy
+        copy = Deck.__new__(Deck)
+        copy.cards = self.cards.copy()
+        return copy
 
 class Graph:
+    __slots__ = ('adjacency_list',)
+    
     def __init__(self):  # Time Complexity: O(1)
         self.adjacency_list = {}
     
@@ -89,4 +285,149 @@ class Graph:
         return list(self.adjacency_list.keys())
     
     def get_adjacency_list(self):   # Time Complexity: O(V + E)
-        return self.adjacency_list.copy()
\ No newline at end of file
+        return self.adjacency_list.copy()
+    
+    def clone(self):   # Time Complexity: O(V + E)
+        copy = Graph()
+        copy.adjacency_list = {vertex: list(neighbors) for vertex, neighbors in self.adjacency_list.items()}
+        return copy
+
+class PersistentStack:
+    """
+    Immutable stack (a cons list of (value, rest) pairs). push / pop return a new stack and
+    leave this one untouched; both versions share every node below the change, so keeping
+    many versions of a pile alive costs O(1) extra per version.
+    Used for decks too: the top end is O(1), the bottom end is O(n) (epidemics only).
+    """
+    __slots__ = ('cells', 'size')
+    
+    def __init__(self, values=()):  # Time Complexity: O(n), values[0] ends up on top
+        cells = None
+        values = list(values)
+        for value in reversed(values):
+            cells = (value, cells)
+        self.cells = cells
+        self.size  = len(values)
+    
+    @staticmethod
+    def _make(cells, size):   # Time Complexity: O(1)
+        stack = PersistentStack.__new__(PersistentStack)
+        stack.cells = cells
+        stack.size  = size
+        return stack
+    
+    def push(self, value):   # Time Complexity: O(1)
+        return PersistentStack._make((value, self.cells), self.size + 1)
+    
+    def push_top_many(self, values):   # Time Complexity: O(k), values[0] ends up on top
+        cells = self.cells
+        for value in reversed(values):
+            cells = (value, cells)
+        return PersistentStack._make(cells, self.size + len(values))
+    
+    def pop(self):   # Time Complexity: O(1)
+        # Returns: (top value, rest of the stack), or (None, self) when empty
+        if self.cells is None:
+            return None, self
+        value, rest = self.cells
+        return value, PersistentStack._make(rest, self.size - 1)
+    
+    def pop_many(self, k):   # Time Complexity: O(k)
+        # Rest of the stack after removing the top k values (shares all of it)
+        cells = self.cells
+        for _ in range(min(k, self.size)):
+            cells = cells[1]
+        return PersistentStack._make(cells, max(0, self.size - k))
+    
+    def pop_bottom(self):   # Time Complexity: O(n), copies every cell above the bottom one
+        if self.cells is None:
+            return None, self
+        values = self.snapshot()
+        return values[-1], PersistentStack(values[:-1])
+    
+    def push_bottom(self, value):   # Time Complexity: O(n)
+        return PersistentStack(self.snapshot() + (value,))
+    
+    def peek(self):   # Time Complexity: O(1)
+        return None if self.cells is None else self.cells[0]
+    
+    def is_empty(self):   # Time Complexity: O(1)
+        return self.cells is None
+    
+    def __len__(self):    # Time Complexity: O(1)
+        return self.size
+    
+    def __iter__(self):   # Time Complexity: O(n), top first
+        cells = self.cells
+        while cells is not None:
+            yield cells[0]
+            cells = cells[1]
+    
+    def snapshot(self):   # Time Complexity: O(n)
+        return tuple(self)
+
+class PersistentVector:
+    """
+    Immutable fixed-length array stored as a 16-way trie of tuples. set() copies only the
+    path from the root to one leaf (O(log n) small tuples) and shares everything else,
+    so two versions that differ in one slot cost a few dozen references, not a full copy.
+    """
+    __slots__ = ('root', 'size', 'shift')
+    
+    BITS  = 4
+    WIDTH = 1 << BITS
+    MASK  = WIDTH - 1
+    
+    def __init__(self, values=()):  # Time Complexity: O(n)
+        nodes = tuple(values)
+        self.size  = len(nodes)
+        self.shift = 0
+        nodes = [nodes[i:i + self.WIDTH] for i in range(0, len(nodes), self.WIDTH)] or [()]
+        while len(nodes) > 1:
+            nodes = [tuple(nodes[i:i + self.WIDTH]) for i in range(0, len(nodes), self.WIDTH)]
+            self.shift += self.BITS
+        self.root = nodes[0]
+    
+    def __getitem__(self, index):   # Time Complexity: O(log n)
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        node = self.root
+        shift = self.shift
+        while shift:
+            node = node[(index >> shift) & self.MASK]
+            shift -= self.BITS
+        return node[index & self.MASK]
+    
+    def set(self, index, value):   # Time Complexity: O(log n)
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        path = []
+        node = self.root
+        shift = self.shift
+        while shift:
+            path.append(node)
+            node = node[(index >> shift) & self.MASK]
+            shift -= self.BITS
+        position = index & self.MASK
+        node = node[:position] + (value,) + node[position + 1:]
+        for parent in reversed(path):
+            shift += self.BITS
+            position = (index >> shift) & self.MASK
+            node = parent[:position] + (node,) + parent[position + 1:]
+        vector = PersistentVector.__new__(PersistentVector)
+        vector.root  = node
+        vector.size  = self.size
+        vector.shift = self.shift
+        return vector
+    
+    def __len__(self):    # Time Complexity: O(1)
+        return self.size
+    
+    def __iter__(self):   # Time Complexity: O(n)
+        def walk(node, shift):
+            if shift == 0:
+                yield from node
+            else:
+                for child in node:
+                    yield from walk(child, shift - self.BITS)
+        return walk(self.root, self.shift)
@@ -1,11 +1,17 @@
 import random
-from data_structures import Queue, Stack
+from data_structures import Deck, Stack
 from board import Board
+from action_rules import resolve_action
 
 
 class Player:
+    __slots__ = ('id', '_location', 'hand', 'actions_remaining', 'max_hand_size',
+                 'cpu_first_action_done', 'cpu_committed_plan', 'zobrist')
+    
     def __init__(self, player_id, starting_city):  # Time Complexity: O(1)
         self.id = player_id
+        self.zobrist = 0  # XOR of this player's location and hand keys, see GameState.zobrist_hash
+        self._location = None
         self.location = starting_city
         self.hand = set()
         self.actions_remaining = 4
@@ -13,12 +19,32 @@ class Player:
         self.cpu_first_action_done = False
         self.cpu_committed_plan = None
     
+    @property
+    def location(self):  # Time Complexity: O(1)
+        return self._location
+    
+    @location.setter
+    def location(self, city):  # Time Complexity: O(1)
+        keys = Board.ZOBRIST_KEYS.location_keys
+        offset = self.id * Board.MAP_INDEX.num_cities
+        if self._location is not None:
+            self.zobrist ^= keys[offset + Board.MAP_INDEX.city_index[self._location]]
+        if city is not None:
+            self.zobrist ^= keys[offset + Board.MAP_INDEX.city_index[city]]
+        self._location = city
+    
+    def _hand_key(self, card):  # Time Complexity: O(1)
+        return Board.ZOBRIST_KEYS.hand_keys[self.id * Board.MAP_INDEX.num_cities + Board.MAP_INDEX.city_index[card]]
+    
     def add_card(self, card):  # Time Complexity: O(1)
-        self.hand.add(card)
+        if card not in self.hand:
+            self.hand.add(card)
+            self.zobrist ^= self._hand_key(card)
     
     def remove_card(self, card):  # Time Complexity: O(1)
         if card in self.hand:
             self.hand.remove(card)
+            self.zobrist ^= self._hand_key(card)
             return True
         return False
     
@@ -27,23 +53,87 @@ class Player:
     
     def get_hand_size(self):  # Time Complexity: O(1)
         return len(self.hand)
+    
+    def clone(self):  # Time Complexity: O(H)
+        copy = Player.__new__(Player)
+        copy.id = self.id
+        copy._location = self._location
+        copy.zobrist = self.zobrist
+        copy.hand = set(self.hand)
+        copy.actions_remaining = self.actions_remaining
+        copy.max_hand_size = self.max_hand_size
+        copy.cpu_first_action_done = self.cpu_first_action_done
+        # Plans are small flat dicts that get replaced, never edited in place
+        copy.cpu_committed_plan = None if self.cpu_committed_plan is None else dict(self.cpu_committed_plan)
+        return copy
+
+
+class StateDelta:
+    """
+    Undo record of one GameState.apply_* step; GameState.undo(delta) puts everything back.
+    Holds only what the step can change: the touched players' fields, the scalar counters,
+    the (slot, old_count) cube journal (outbreak cascades included), pile sizes plus the cards
+    that left the top of a deck, and structure counts. When the step may reshuffle the
+    infection discard, both infection piles and the RNG state are kept whole instead.
+    result: return value of the wrapped step. A record can be undone once, newest first.
+    """
+    __slots__ = ('result', 'players', 'counters', 'cured', 'cube_changes', 'structures',
+                 'player_deck_size', 'player_deck_top', 'player_discard_size',
+                 'infection_deck_size', 'infection_deck_top', 'infection_discard_size',
+                 'infection_piles', 'rng_state')
+    
+    def __init__(self, game_state, players, player_draws=0, infection_draws=0, may_reshuffle=False, structures=None):  # Time Complexity: O(P × H + k), O(C) when may_reshuffle
+        self.result = None
+        self.players = [(player, player._location, player.zobrist, set(player.hand), player.actions_remaining,
+                         player.cpu_first_action_done, player.cpu_committed_plan) for player in players]
+        self.counters = (game_state.outbreak_count, game_state.infection_rate, game_state.epidemic_count,
+                         game_state.current_player_idx, game_state.supply_exhausted, game_state.player_deck_exhausted,
+                         game_state.infection_layers)
+        self.cured = set(game_state.cured_diseases)
+        self.cube_changes = []
+        self.structures = structures
+        self.player_deck_size = len(game_state.player_deck)
+        self.player_deck_top  = game_state.player_deck.peek_top(player_draws)
+        self.player_discard_size = len(game_state.player_discard)
+        self.infection_deck_size = len(game_state.infection_deck)
+        self.infection_deck_top  = game_state.infection_deck.peek_top(infection_draws)
+        self.infection_discard_size = len(game_state.infection_discard)
+        self.infection_piles = None
+        self.rng_state = None
+        if may_reshuffle:
+            self.infection_piles = (game_state.infection_deck.snapshot(), game_state.infection_discard.snapshot())
+            self.rng_state = game_state.rng.getstate()
 
 
 class GameState:
-    def __init__(self):  # Time Complexity: O(V + C)
+    __slots__ = ('rng', 'board', 'players', 'player_deck', 'infection_deck',
+                 'player_discard', 'infection_discard', 'infection_layers', 'cured_diseases',
+                 'outbreak_count', 'max_outbreaks', 'infection_rate', 'epidemic_count', 'max_epidemics',
+                 'current_player_idx', 'game_started', 'supply_exhausted', 'player_deck_exhausted')
+    
+    def __init__(self, seed=None, node_pool=None):  # Time Complexity: O(V + C)
+        """
+        seed: seeds the game's own RNG stream
+        node_pool: optional data_structures.NodePool shared by the discard piles
+        """
+        # Every shuffle and CPU tie-breaker draws from this stream, so a seed replays a whole game
+        self.rng   = random.Random(seed)
         self.board = Board()
 
         self.players = []
         for i in range(2):
             self.players.append(Player(i, None))
         
-        self.player_deck    = Queue()
-        self.infection_deck = Queue()
+        self.player_deck    = Deck()
+        self.infection_deck = Deck()
         
-        self.player_discard    = Stack()
-        self.infection_discard = Stack()
+        self.player_discard    = Stack(node_pool)
+        self.infection_discard = Stack(node_pool)
         
         self.initialize_decks()
+        # Sizes of the reshuffled discard piles stacked on top of the infection deck, top pile first.
+        # Public knowledge: the players saw those cards, only their order within a pile is hidden
+        self.infection_layers = ()
         self.cured_diseases = set()
         
         self.outbreak_count  = 0
@@ -59,17 +149,87 @@ class GameState:
     
     def initialize_decks(self):  # Time Complexity: O(C)
         city_cards = list(self.board.cities)
-        random.shuffle(city_cards)
+        self.rng.shuffle(city_cards)
         
         for card in city_cards:
             self.player_deck.enqueue(card)
         
         infection_cards = city_cards.copy()
-        random.shuffle(infection_cards)
+        self.rng.shuffle(infection_cards)
         
         for card in infection_cards:
             self.infection_deck.enqueue(card)
     
+    def clone(self, rng=None): # Time Complexity: O(V × D + C)
+        """
+        Independent copy of the whole game for look-ahead search, much cheaper than copy.deepcopy.
+        By default the copy continues the same RNG stream (both states draw identical shuffles);
+        rng: give the copy this random.Random instead, e.g. a freshly seeded one for a rollout,
+             which also skips the ~20us state copy
+        """
+        copy = GameState.__new__(GameState)
+        if rng is None:
+            # Random.__new__ skips seeding from os.urandom, setstate overwrites the state anyway
+            rng = random.Random.__new__(random.Random)
+            rng.setstate(self.rng.getstate())
+        copy.rng = rng
+        copy.board   = self.board.clone()
+        copy.players = [player.clone() for player in self.players]
+        copy.player_deck    = self.player_deck.clone()
+        copy.infection_deck = self.infection_deck.clone()
+        copy.player_discard    = self.player_discard.clone()
+        copy.infection_discard = self.infection_discard.clone()
+        copy.infection_layers  = self.infection_layers
+        copy.cured_diseases = set(self.cured_diseases)
+        copy.outbreak_count = self.outbreak_count
+        copy.max_outbreaks  = self.max_outbreaks
+        copy.infection_rate = self.infection_rate
+        copy.epidemic_count = self.epidemic_count
+        copy.max_epidemics  = self.max_epidemics
+        copy.current_player_idx = self.current_player_idx
+        copy.game_started       = self.game_started
+        copy.supply_exhausted   = self.supply_exhausted
+        copy.player_deck_exhausted = self.player_deck_exhausted
+        return copy
+    
+    @property
+    def zobrist_hash(self): # Time Complexity: O(P + D)
+        """
+        64-bit Zobrist hash of the position: cubes, hospitals and railroads (kept by the board),
+        player locations and hands (kept by each Player), cured diseases, outbreak and epidemic
+        counters, player deck size and whose turn it is (folded in here, a handful of XORs).
+        """
+        keys = Board.ZOBRIST_KEYS
+        value = self.board.zobrist_hash
+        for player in self.players:
+            value ^= player.zobrist
+        for color in self.cured_diseases:
+            value ^= keys.cured_keys[Board.MAP_INDEX.color_index[color]]
+        value ^= keys.outbreak_keys[self.outbreak_count]
+        value ^= keys.epidemic_keys[self.epidemic_count]
+        value ^= keys.deck_size_keys[len(self.player_deck)]
+        value ^= keys.current_player_keys[self.current_player_idx]
+        return value
+    
+    def compute_zobrist_hash(self): # Time Complexity: O(V × D + C)
+        # From-scratch recomputation of zobrist_hash, to check the incremental updates
+        keys = Board.ZOBRIST_KEYS
+        index = Board.MAP_INDEX
+        value = self.board.compute_zobrist_hash()
+        for player in self.players:
+            offset = player.id * index.num_cities
+            if player.location is not None:
+                value ^= keys.location_keys[offset + index.city_index[player.location]]
+            for card in player.hand:
+                value ^= keys.hand_keys[offset + index.city_index[card]]
+        for color in self.cured_diseases:
+            value ^= keys.cured_keys[index.color_index[color]]
+        value ^= keys.outbreak_keys[self.outbreak_count]
+        value ^= keys.epidemic_keys[self.epidemic_count]
+        value ^= keys.deck_size_keys[len(self.player_deck)]
+        value ^= keys.current_player_keys[self.current_player_idx]
+        return value
+    
     def get_current_player(self): # Time Complexity: O(1)
         return self.players[self.current_player_idx]
     
@@ -91,7 +251,7 @@ class GameState:
         
         return card, None
     
-    def handle_epidemic(self): # Time Complexity: O(C + k * degree) where k = outbreak chain length
+    def handle_epidemic(self): # Time Complexity: O(d + k * degree) where d = infection discard size, k = outbreak chain length
         self.epidemic_count += 1
         
         if self.infection_deck.is_empty():
@@ -100,13 +260,10 @@ class GameState:
             else:
                 return {'city': None, 'color': None, 'cubes_added': 0, 'outbreak_occurred': False, 'supply_exhausted': False, 'epidemic_steps': []}
         
-        temp_stack = Stack()
-        while not self.infection_deck.is_empty():
-            temp_stack.push(self.infection_deck.dequeue())
-        bottom_city = temp_stack.pop()
-        
-        while not temp_stack.is_empty():
-            self.infection_deck.enqueue(temp_stack.pop())
+        if self.infection_layers and sum(self.infection_layers) == len(self.infection_deck):
+            # no unseen cards left below the reshuffled piles: the bottom card leaves the last pile
+            self._shrink_infection_layer(len(self.infection_layers) - 1)
+        bottom_city = self.infection_deck.draw_bottom()
         
         if bottom_city is None:
             return {'city': None, 'color': None, 'cubes_added': 0, 'outbreak_occurred': False, 'supply_exhausted': False, 'epidemic_steps': []}
@@ -185,78 +342,53 @@ class GameState:
             'epidemic_steps': epidemic_steps
         }
     
-    def reshuffle_infection_discard(self, place_on_top=False): # Time Complexity: O(C)
-        discard_list = []
-        while not self.infection_discard.is_empty():
-            discard_list.append(self.infection_discard.pop())
-        random.shuffle(discard_list)
+    def reshuffle_infection_discard(self, place_on_top=False): # Time Complexity: O(d) where d = infection discard size
+        discard_list = list(self.infection_discard)  # pop order, top card first
+        self.infection_discard.clear()
+        self.rng.shuffle(discard_list)
         
-        if place_on_top and not self.infection_deck.is_empty():
-            current_deck = []
-            while not self.infection_deck.is_empty():
-                current_deck.append(self.infection_deck.dequeue())
-            
-            for card in discard_list:
-                self.infection_deck.enqueue(card)
-            
-            for card in current_deck:
-                self.infection_deck.enqueue(card)
+        if place_on_top:
+            self.infection_deck.push_top_many(discard_list)
+            self.infection_layers = (len(discard_list),) + self.infection_layers
         else:
+            # only done on an empty deck, so the pile goes under every other reshuffled pile
             for card in discard_list:
                 self.infection_deck.enqueue(card)
+            self.infection_layers = self.infection_layers + (len(discard_list),)
+    
+    def draw_infection_card(self): # Time Complexity: O(L) where L = reshuffled piles on the deck (a handful)
+        if self.infection_layers and not self.infection_deck.is_empty():
+            self._shrink_infection_layer(0)
+        return self.infection_deck.dequeue()
     
-    def handle_outbreak(self, city, color): # Time Complexity: O(k × degree), Space Complexity: O(k) where k = cities in outbreak chain
+    def _shrink_infection_layer(self, index): # Time Complexity: O(L) where L = reshuffled piles on the deck
+        layers = list(self.infection_layers)
+        layers[index] -= 1
+        if layers[index] == 0:
+            del layers[index]
+        self.infection_layers = tuple(layers)
+    
+    def handle_outbreak(self, city, color): # Time Complexity: O(k × degree) where k = cities in outbreak chain
         if self.outbreak_count >= self.max_outbreaks:
             return False
         if city is None or color is None:
             return False
-        visited_this_outbreak = set([city])  # O(k) space - at most k cities in chain
-    
-        queue = Queue()  # O(k) space - at most k cities in chain
-        queue.enqueue(city)
-        outbreaks_in_chain = 1
-        supply_exhausted = False
-        
-        while not queue.is_empty():
-            if self.outbreak_count + outbreaks_in_chain >= self.max_outbreaks:
-                outbreaks_in_chain = self.max_outbreaks - self.outbreak_count
-                break
-            
-            current = queue.dequeue()
-            neighbors = self.board.get_outbreak_neighbors(current)
-            
-            for neighbor in neighbors:
-                if neighbor in visited_this_outbreak:
-                    continue
-                visited_this_outbreak.add(neighbor)
-                current_cubes = self.board.get_cube_count(neighbor, color)
-                if current_cubes >= 3:
-                    outbreaks_in_chain += 1
-                    if self.outbreak_count + outbreaks_in_chain >= self.max_outbreaks:
-                        outbreaks_in_chain = self.max_outbreaks - self.outbreak_count
-                        break
-                    queue.enqueue(neighbor)
-                else:
-                    cubes_added = self.board.add_cubes(neighbor, color, 1)
-                    if cubes_added == 0:
-                        supply_exhausted = True
-                        continue
-            
-            if self.outbreak_count + outbreaks_in_chain >= self.max_outbreaks:
-                break
-
+        # The chain may use whatever outbreaks are left before the loss limit
+        outbreaks_in_chain, supply_exhausted = self.board.spread_outbreak(city, color, self.max_outbreaks - self.outbreak_count)
         self.outbreak_count += outbreaks_in_chain
         return supply_exhausted
     
     def infect_cities(self): # Time Complexity: O(infection_rate × (V + k * degree)) worst case where k = outbreak chain length
         for _ in range(self.infection_rate):
+            if self.supply_exhausted:
+                return
             if self.infection_deck.is_empty():
                 if not self.infection_discard.is_empty():
                     self.reshuffle_infection_discard()
                 else:
                     continue
             
-            city = self.infection_deck.dequeue()
+            city = self.draw_infection_card()
             if city is None:
                 continue
             color = self.board.get_city_color(city)
@@ -268,12 +400,150 @@ class GameState:
             current_cubes = self.board.get_cube_count(city, color)
             
             if current_cubes < 3:
-                self.board.add_cubes(city, color, 1)
+                if self.board.add_cubes(city, color, 1) == 0:
+                    self.supply_exhausted = True
+                    return
             else:
-                self.handle_outbreak(city, color)
+                if self.handle_outbreak(city, color):
+                    self.supply_exhausted = True
+                    return
+                if self.check_loss():
+                    return
             
             self.infection_discard.push(city)
     
+    def _run_step(self, delta, step, *args): # Time Complexity: O(step)
+        # Runs one step with the cube journal pointed at the delta
+        core = self.board.core
+        core.journal = delta.cube_changes
+        try:
+            delta.result = step(*args)
+        finally:
+            core.journal = None
+        return delta
+    
+    def apply_action(self, player, action): # Time Complexity: O(P × H) on top of perform_action
+        """
+        perform_action with an undo record, for search on one mutable state.
+        Returns: StateDelta, or None when the action is illegal (nothing changed)
+        """
+        action_type, target = action
+        players = [player]
+        if action_type in ("give", "take") and 0 <= target < len(self.players):
+            players.append(self.players[target])
+        structures = None
+        if action_type in ("build_hospital", "build_railroad"):
+            structures = self.board.save_structures(railroads=(action_type == "build_railroad"))
+        delta = self._run_step(StateDelta(self, players, structures=structures), self.perform_action, player, action)
+        if not delta.result:
+            return None   # every rule check comes before the first change
+        return delta
+    
+    def apply_draw_player_card(self, player): # Time Complexity: O(P × H) on top of draw_player_card, O(C) more on an epidemic
+        """
+        Draws one player card like a turn does: a city card joins the hand, an epidemic is
+        resolved and goes to the player discard. The hand limit is left to the caller (apply_discard).
+        Returns: StateDelta with result = (card, epidemic_info) as from draw_player_card
+        """
+        epidemic = self.player_deck.peek_top(1) == ['EPIDEMIC']
+        delta = self._run_step(StateDelta(self, [player], player_draws=1, may_reshuffle=epidemic), self.draw_player_card)
+        card, epidemic_info = delta.result
+        if epidemic_info:
+            self.player_discard.push(card)
+        elif card is not None:
+            player.add_card(card)
+        return delta
+    
+    def apply_discard(self, player, card): # Time Complexity: O(P × H)
+        delta = StateDelta(self, [player])
+        if player.remove_card(card):
+            self.player_discard.push(card)
+            delta.result = True
+        return delta
+    
+    def apply_infection(self): # Time Complexity: O(P × H) on top of infect_cities, O(C) more when the infection deck runs out
+        # The RNG is only used to reshuffle, which can only happen when the deck runs out mid-step
+        may_reshuffle = len(self.infection_deck) < self.infection_rate
+        delta = StateDelta(self, (), infection_draws=self.infection_rate, may_reshuffle=may_reshuffle)
+        return self._run_step(delta, self.infect_cities)
+    
+    def apply_next_turn(self): # Time Complexity: O(P × H)
+        delta = StateDelta(self, [self.players[(self.current_player_idx + 1) % len(self.players)]])
+        self.next_turn()
+        return delta
+    
+    def undo(self, delta): # Time Complexity: O(P × H + k), O(C) when the step kept whole piles
+        """
+        Restores the state from just before the step that returned `delta`.
+        Steps must be undone in reverse order of application.
+        """
+        for player, location, zobrist, hand, actions_remaining, first_action_done, plan in delta.players:
+            player._location = location
+            player.zobrist = zobrist
+            player.hand.clear()
+            player.hand.update(hand)
+            player.actions_remaining = actions_remaining
+            player.cpu_first_action_done = first_action_done
+            player.cpu_committed_plan = plan
+        (self.outbreak_count, self.infection_rate, self.epidemic_count, self.current_player_idx,
+         self.supply_exhausted, self.player_deck_exhausted, self.infection_layers) = delta.counters
+        self.cured_diseases.clear()
+        self.cured_diseases.update(delta.cured)
+        self.board.core.undo_cube_changes(delta.cube_changes)
+        if delta.structures is not None:
+            self.board.restore_structures(delta.structures)
+        
+        while len(self.player_discard) > delta.player_discard_size:
+            self.player_discard.pop()
+        drawn = delta.player_deck_size - len(self.player_deck)
+        if drawn:
+            self.player_deck.push_top_many(delta.player_deck_top[:drawn])
+        
+        if delta.infection_piles is not None:
+            self.infection_deck.restore(delta.infection_piles[0])
+            self.infection_discard.restore(delta.infection_piles[1])
+            self.rng.setstate(delta.rng_state)
+        else:
+            while len(self.infection_discard) > delta.infection_discard_size:
+                self.infection_discard.pop()
+            drawn = delta.infection_deck_size - len(self.infection_deck)
+            if drawn:
+                self.infection_deck.push_top_many(delta.infection_deck_top[:drawn])
+    
+    def perform_action(self, player, action): # Time Complexity: O(H log H) for research, O(degree + min(n1, n2)) for a railroad, O(1) otherwise
+        """
+        Applies one action tuple (as returned by choose_cpu_action) without printing.
+        The rules live in action_rules.resolve_action, shared with PersistentGameState.
+        Returns: True if the action was legal and applied, False otherwise
+        """
+        effect = resolve_action(self.board, self.players, self.cured_diseases, player, action)
+        if effect is None:
+            return False
+        kind = effect[0]
+        if kind == "move":
+            player.location = effect[1]
+        elif kind == "build_railroad":
+            self.board.build_railroad(effect[1], effect[2])
+        elif kind == "build_hospital":
+            _, city, color = effect
+            self.board.build_hospital(city, color)
+            player.remove_card(city)
+            self.player_discard.push(city)
+        elif kind == "treat":
+            self.board.remove_cubes(effect[1], effect[2], 1)
+        elif kind == "transfer":
+            _, giver_id, receiver_id, card = effect
+            self.players[giver_id].remove_card(card)
+            self.players[receiver_id].add_card(card)
+        elif kind == "research":
+            _, color, cards = effect
+            for card in cards:
+                player.remove_card(card)
+                self.player_discard.push(card)
+            self.cured_diseases.add(color)
+        player.actions_remaining -= 1
+        return True
+    
     def check_win(self): # Time Complexity: O(1)
         return len(self.cured_diseases) == len(self.board.DISEASE_COLORS)
     
@@ -0,0 +1,54 @@
+from board import Board
+
+
+SKIP_ACTION = ("skip", None)   # end the action phase early
+
+CARRIAGE_DESTINATIONS = {city: frozenset(neighbors) for city, neighbors in Board.CITY_CONNECTIONS.items()}
+
+
+def list_legal_actions(game_state, player):   # Time Complexity: O(V log V) for sorting the moves, O(1) otherwise (H ≤ 8)
+    """
+    Every action tuple GameState.perform_action would accept for `player` in one pass,
+    without printing or changing anything; works for either player, whoever's turn it is.
+    Uses the static neighbor and port tables and the board's railroad network member lists.
+    Returns: list of actions ordered by type, then by city / color / player id, ending with SKIP_ACTION
+    """
+    board = game_state.board
+    current = player.location
+    if current is None:
+        return [SKIP_ACTION]
+
+    destinations = set(CARRIAGE_DESTINATIONS[current])
+    destinations.update(board.get_railroad_network(current))
+    if current in board.PORT_CITIES:
+        destinations.update(Board.PORT_CITIES_SORTED)
+    destinations.discard(current)
+    actions = [("move", city) for city in sorted(destinations)]
+
+    if board.get_railroads_remaining() > 0:
+        actions.extend(("build_railroad", city) for city in board.get_neighbors(current)
+                       if not board.has_railroad(current, city))
+
+    hand = player.hand
+    color = board.get_city_color(current)
+    if current in hand and color not in board.hospitals:
+        actions.append(("build_hospital", current))
+
+    cubes = board.get_city_cubes(current)
+    actions.extend(("treat", cube_color) for cube_color, count in zip(board.DISEASE_COLORS, cubes) if count)
+
+    for other in game_state.players:
+        if other.id == player.id or other.location != current:
+            continue
+        if current in hand and other.get_hand_size() < other.max_hand_size:
+            actions.append(("give", other.id))
+        if current in other.hand:
+            actions.append(("take", other.id))
+
+    hospital_color = board.get_hospital_color(current)
+    if hospital_color is not None and hospital_color not in game_state.cured_diseases:
+        if sum(1 for card in hand if board.get_city_color(card) == hospital_color) >= 5:
+            actions.append(("research", hospital_color))
+
+    actions.append(SKIP_ACTION)
+    return actions
@@ -0,0 +1,373 @@
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from data_structures import Deck
+from board import Board
+from legal_actions import SKIP_ACTION, list_legal_actions
+from cpu_player import GreedyCpuPolicy, choose_starting_city_for_cpu, choose_cpu_discard
+from simulation import play_headless_turn, enforce_hand_limit
+
+
+class RandomCpuPolicy:
+    # Uniformly random legal actions, drawn from the game's own RNG (cheap rollouts, baseline opponent)
+    def choose_starting_city(self, game_state, player):   # Time Complexity: O(H log H)
+        return game_state.rng.choice(sorted(player.hand))
+
+    def choose_action(self, game_state, player):   # Time Complexity: O(V log V)
+        return game_state.rng.choice(list_legal_actions(game_state, player))
+
+    def choose_discard(self, game_state, player):   # Time Complexity: O(H log H)
+        return game_state.rng.choice(sorted(player.hand))
+
+
+ROLLOUT_POLICIES = {'greedy': GreedyCpuPolicy, 'random': RandomCpuPolicy}
+
+
+def evaluate_state(game_state):   # Time Complexity: O(P × H + D)
+    """
+    Rollout score in [0, 1]: 1 for a win. Otherwise cures found count most, then progress
+    toward the next cure (most cards of one uncured color in a hand, a hospital of that color),
+    then safety: outbreak headroom, cubes left in the supply and few 3-cube cities (where the
+    next outbreaks come from). A loss keeps half of the cure part and no safety.
+    """
+    if game_state.check_win():
+        return 1.0
+    board = game_state.board
+    colors = board.DISEASE_COLORS
+    cured = game_state.cured_diseases
+    progress = 0.0
+    for color in colors:
+        if color not in cured:
+            cards = max(sum(1 for card in player.hand if board.get_city_color(card) == color) for player in game_state.players)
+            progress = max(progress, 0.3 * (color in board.hospitals) + 0.7 * min(cards, 5) / 5)
+    value = 0.6 * len(cured) / len(colors) + 0.15 * progress + 0.05 * len(board.hospitals) / len(colors)
+    if game_state.check_loss():
+        return 0.5 * value
+    cubes = sum(board.get_cubes_on_board(color) for color in colors)
+    hot_cities = len(board.get_cities_with_cube_count(3))
+    safety = (0.5 * (1 - game_state.outbreak_count / game_state.max_outbreaks)
+              + 0.25 * (1 - cubes / (len(colors) * board.MAX_CUBES_PER_COLOR))
+              + 0.25 * (1 - min(hot_cities, 10) / 10))
+    return value + 0.2 * safety
+
+
+def determinize(game_state):   # Time Complexity: O(C)
+    """
+    Shuffles what the players cannot know, in place (use it on a rollout copy): the player deck,
+    whose epidemics were shuffled in uniformly, and the infection deck one pile at a time. The
+    reshuffled discard piles on top of it (GameState.infection_layers) keep their cards, only
+    their order changes, and the never-drawn cards stay below them.
+    """
+    rng = game_state.rng
+    cards = list(game_state.player_deck)
+    rng.shuffle(cards)
+    game_state.player_deck = Deck(cards)
+
+    cards = list(game_state.infection_deck)
+    start = 0
+    for size in game_state.infection_layers + (len(cards),):
+        pile = cards[start:start + size]
+        rng.shuffle(pile)
+        cards[start:start + size] = pile
+        start += size
+    game_state.infection_deck = Deck(cards)
+
+
+def paired_lower_bound(diffs, confidence):   # Time Complexity: O(n)
+    # Lower confidence bound (normal approximation) of the mean paired difference, None below 2 pairs
+    n = len(diffs)
+    if n < 2:
+        return None
+    mean = sum(diffs) / n
+    variance = sum((diff - mean) ** 2 for diff in diffs) / (n - 1)
+    return mean - confidence * math.sqrt(variance / n)
+
+
+def choose_with_prior(searches, prior, confidence, min_pairs):   # Time Complexity: O(A × B)
+    """
+    Final choice between the root actions: `prior` (the greedy action) unless another action
+    beats it on at least `min_pairs` shared scenarios with a positive paired_lower_bound; then
+    the action with the highest bound. Without a searched prior, the most visited action.
+    Pairing the n-th rollouts of two actions compares them on the same scenario, so the
+    differences are far less noisy than the two means.
+    searches: one {action: rollout values, n-th value on scenario n} per search (per worker);
+              values are only paired with the prior's values from the same search
+    """
+    visits, diffs = {}, {}
+    for root_values in searches:
+        baseline = root_values.get(prior, ())
+        for action, values in root_values.items():
+            visits[action] = visits.get(action, 0) + len(values)
+            if action != prior:
+                diffs.setdefault(action, []).extend(value - base for value, base in zip(values, baseline))
+    if prior not in visits:
+        return max(visits, key=visits.get)
+    best, best_bound = prior, 0.0
+    for action, action_diffs in diffs.items():
+        if len(action_diffs) < min_pairs:
+            continue
+        bound = paired_lower_bound(action_diffs, confidence)
+        if bound is not None and bound > best_bound:
+            best, best_bound = action, bound
+    return best
+
+
+class MctsNode:
+    __slots__ = ('state', 'action', 'parent', 'children', 'untried', 'visits', 'value_sum', 'key', 'turn_over')
+
+    def __init__(self, state, action=None, parent=None, turn_over=False):  # Time Complexity: O(V log V), see list_legal_actions
+        player = state.get_current_player()
+        self.state  = state
+        self.action = action
+        self.parent = parent
+        self.children = {}
+        self.turn_over = turn_over or player.actions_remaining <= 0 or state.check_loss() or state.check_win()
+        self.untried  = [] if self.turn_over else list_legal_actions(state, player)
+        self.visits    = 0
+        self.value_sum = 0.0
+        self.key = (state.zobrist_hash, player.actions_remaining)
+
+    def best_child(self, exploration, prior=None, prior_bias=0.0):   # Time Complexity: O(children)
+        # UCT, with the exploration term scaled to the spread of the children's mean values
+        # (rollout scores of sibling actions often differ by a few hundredths only), plus a
+        # progressive bias toward `prior` that fades as 1 / visits
+        children = self.children.values()
+        means = [child.value_sum / child.visits for child in children]
+        spread = max(means) - min(means) or 1.0
+        log_visits = math.log(self.visits)
+        scale = exploration * spread
+        bias = prior_bias * spread
+        return max(
+            zip(children, means),
+            key=lambda pair: (pair[1] + scale * math.sqrt(log_visits / pair[0].visits)
+                              + (bias / pair[0].visits if pair[0].action == prior else 0.0)),
+        )[0]
+
+
+class MctsCpuPolicy:
+    """
+    Monte Carlo Tree Search over the current player's actions, anchored on the greedy CPU.
+    The tree covers the rest of the action phase (all of it is deterministic); each leaf is
+    scored by a rollout that finishes the turn and plays `horizon` more turns with the rollout
+    policy on a clone whose hidden cards are reshuffled (see determinize), so the search never
+    peeks at the real card order. Common random numbers: the n-th rollout below every root
+    action replays the same scenario, so root actions are compared pair by pair.
+    GreedyCpuPolicy's action is the prior: the tree favors it (progressive bias) and it is
+    played unless another action beats it with `confidence` standard errors to spare
+    (see choose_with_prior), so the search only overrides greedy where it is clearly better.
+    Budget per action: `rollouts` iterations, or `time_budget` seconds when that is given.
+    The chosen child is kept and reused as the root for the next action of the same turn.
+    """
+    def __init__(self, rollouts=200, time_budget=None, exploration=0.7, horizon=1, rollout_policy='greedy',
+                 scenarios=16, seed=0, prior_bias=1.0, confidence=1.5, min_pairs=8):  # Time Complexity: O(1)
+        self.rollouts = rollouts
+        self.time_budget = time_budget
+        self.exploration = exploration
+        self.horizon = horizon
+        self.rollout_policy = ROLLOUT_POLICIES[rollout_policy]
+        self.scenarios = scenarios
+        self.prior_bias = prior_bias
+        self.confidence = confidence
+        self.min_pairs = min_pairs
+        self.rng = random.Random(seed)
+        self.greedy = GreedyCpuPolicy()
+        self._root = None
+        self._scenarios = []
+        self._prior = None
+        self._root_values = {}
+        self.last_search = {}
+
+    def choose_starting_city(self, game_state, player):   # Time Complexity: O(H × V)
+        return choose_starting_city_for_cpu(game_state, player)
+
+    def choose_discard(self, game_state, player):   # Time Complexity: O(H)
+        return choose_cpu_discard(game_state, player)
+
+    def choose_action(self, game_state, player):   # Time Complexity: O(B × R) where B = iterations, R = rollout cost
+        # Asked on the real player, so greedy's plan bookkeeping stays in step with the game
+        prior = self.greedy.choose_action(game_state, player)
+        root = self._reusable_root(game_state, player)
+        reused = root is not None
+        if root is None:
+            root = MctsNode(game_state.clone())
+        if not root.untried and not root.children:
+            return SKIP_ACTION
+
+        iterations = self._search(root, prior)
+        action = choose_with_prior([self._root_values], prior, self.confidence, self.min_pairs)
+        best = root.children[action]
+        self.last_search = {'iterations': iterations, 'reused_visits': root.visits - iterations if reused else 0,
+                            'children': len(root.children), 'greedy': action == prior}
+        best.parent = None
+        self._root = best if not best.turn_over else None
+        return best.action
+
+    def root_statistics(self, game_state, prior=None):   # Time Complexity: O(B × R)
+        """
+        Search from a fresh root at `game_state` (searched in place, pass a copy you own). Nothing
+        is kept between calls, so the result depends only on the position, `prior` and self.rng.
+        prior: the action to favor, as in choose_action
+        Returns: {action: rollout values of this search} for every root action searched,
+                 n-th value on scenario n (the input of choose_with_prior)
+        """
+        root = MctsNode(game_state)
+        self._root_values = {}
+        if root.untried:
+            self._search(root, prior)
+        return self._root_values
+
+    def _search(self, root, prior):   # Time Complexity: O(B × R)
+        self._scenarios = [self.rng.getrandbits(64) for _ in range(self.scenarios)]
+        self._prior = prior
+        self._root_values = {}
+        if prior in root.untried:   # searched first, so every other action is paired with it
+            root.untried.remove(prior)
+            root.untried.append(prior)
+        iterations = 0
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        while (iterations < self.rollouts) if deadline is None else (time.perf_counter() < deadline or iterations == 0):
+            self._iterate(root)
+            iterations += 1
+        return iterations
+
+    def _reusable_root(self, game_state, player):   # Time Complexity: O(P + D)
+        root, self._root = self._root, None
+        if root is None or root.state.current_player_idx != player.id:
+            return None
+        if root.key != (game_state.zobrist_hash, player.actions_remaining):
+            return None
+        return root
+
+    def _iterate(self, root):   # Time Complexity: O(depth × children + R)
+        node, branch = root, None
+        while not node.untried and node.children:
+            if node is root:
+                node = node.best_child(self.exploration, self._prior, self.prior_bias)
+            else:
+                node = node.best_child(self.exploration)
+            branch = branch or node
+        if node.untried:
+            if node is root and node.untried[-1] == self._prior:
+                action = node.untried.pop()
+            else:
+                action = node.untried.pop(self.rng.randrange(len(node.untried)))
+            node = self._expand(node, action)
+            branch = branch or node
+        # Common random numbers: the n-th rollout of this search below every root action
+        # replays the same hidden card order and dice
+        values = self._root_values.setdefault(branch.action, [])
+        value = self._rollout(node.state, self._scenarios[len(values) % len(self._scenarios)])
+        values.append(value)
+        while node is not None:
+            node.visits += 1
+            node.value_sum += value
+            node = node.parent
+
+    def _expand(self, node, action):   # Time Complexity: O(V × D + C) for the clone
+        state = node.state.clone()
+        player = state.get_current_player()
+        turn_over = False
+        if action == SKIP_ACTION:
+            player.actions_remaining = 0
+            turn_over = True
+        elif state.perform_action(player, action) and action[0] in ("give", "take"):
+            policy = GreedyCpuPolicy()
+            for p in state.players:
+                enforce_hand_limit(state, p, policy)
+        child = MctsNode(state, action, node, turn_over)
+        node.children[action] = child
+        return child
+
+    def _rollout(self, state, scenario):   # Time Complexity: O(horizon × turn cost)
+        rollout = state.clone(random.Random(scenario))
+        determinize(rollout)
+        policies = [self.rollout_policy() for _ in rollout.players]
+        for _ in range(self.horizon + 1):  # the unfinished current turn, then `horizon` full turns
+            if rollout.check_win() or rollout.check_loss():
+                break
+            play_headless_turn(rollout, rollout.get_current_player(), policies)
+            rollout.next_turn()
+        return evaluate_state(rollout)
+
+
+_worker_search = None   # this worker process's MctsCpuPolicy, created once by _init_search_worker
+
+
+def _init_search_worker(search_options):   # Time Complexity: O(V × (V + E)) once per worker process
+    # Runs once per worker: the map and Zobrist tables were built by the imports above; the
+    # movement trees of the railroad-free board (shared by every board without railroads)
+    # are filled here for all sources, so no search pays for them
+    global _worker_search
+    board = Board()
+    for city in board.cities:
+        board.get_distance_field(city)
+    _worker_search = MctsCpuPolicy(**search_options)
+
+
+def _search_in_worker(game_state, seed, prior):   # Time Complexity: O(B × R)
+    _worker_search.rng.seed(seed)
+    return _worker_search.root_statistics(game_state, prior)
+
+
+class ParallelMctsCpuPolicy:
+    """
+    Root-parallel MCTS: every worker process searches its own copy of the position with its
+    own RNG stream, all favoring the greedy action found here on the real player, and the
+    paired rollout values of all workers decide as in MctsCpuPolicy (choose_with_prior).
+    Every task starts from a fresh root and the worker RNG is reseeded from this policy's
+    `seed` stream, so with a rollout budget a fixed seed replays the same actions (a time
+    budget depends on the machine's load). Which worker gets which task is up to the pool,
+    so no worker keeps a tree between decisions, unlike MctsCpuPolicy within a turn. The pool is started on the first decision and
+    kept for the whole game, so a decision only ships the pickled GameState (a few KB) out
+    and one list of rollout values per root action and worker back.
+    workers: number of processes (default: CPU cores); rollouts / time_budget apply per worker.
+    Other keyword arguments are passed on to MctsCpuPolicy. Call close() to stop the pool.
+    """
+    def __init__(self, workers=None, rollouts=200, time_budget=None, seed=0, confidence=1.5, min_pairs=8,
+                 **search_options):  # Time Complexity: O(1)
+        self.workers = workers or os.cpu_count() or 1
+        self.search_options = dict(search_options, rollouts=rollouts, time_budget=time_budget)
+        self.confidence = confidence
+        self.min_pairs = min_pairs
+        self.rng = random.Random(seed)
+        self.greedy = GreedyCpuPolicy()
+        self._executor = None
+        self.last_search = {}
+
+    def choose_starting_city(self, game_state, player):   # Time Complexity: O(H × V)
+        return choose_starting_city_for_cpu(game_state, player)
+
+    def choose_discard(self, game_state, player):   # Time Complexity: O(H)
+        return choose_cpu_discard(game_state, player)
+
+    def choose_action(self, game_state, player):   # Time Complexity: O(B × R / W) wall time + O(W × state size) pickling
+        prior = self.greedy.choose_action(game_state, player)   # on the real player, as in MctsCpuPolicy
+        actions = list_legal_actions(game_state, player)
+        if len(actions) == 1:
+            return actions[0]
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_search_worker,
+                                                 initargs=(self.search_options,))
+        futures = [self._executor.submit(_search_in_worker, game_state, self.rng.getrandbits(64), prior)
+                   for _ in range(self.workers)]
+        searches = [future.result() for future in futures]
+
+        best = choose_with_prior(searches, prior, self.confidence, self.min_pairs)
+        self.last_search = {'iterations': sum(len(values) for search in searches for values in search.values()),
+                            'workers': self.workers, 'children': len({action for search in searches for action in search}),
+                            'greedy': best == prior}
+        return best
+
+    def close(self):   # Time Complexity: O(W)
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __getstate__(self):   # Time Complexity: O(1)
+        # A running pool cannot be pickled; a copy (e.g. one sent to a batch worker) starts its own
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        return state
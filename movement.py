@@ -0,0 +1,58 @@
+def compute_movement_tree(board, source):   # Time Complexity: O(V + E + P) where P = number of port cities
+    """
+    Fewest move actions from `source` to every reachable city, combining all three movement
+    modes: carriage (one edge), train (anywhere on the same railroad network) and ship (port to
+    any other port), e.g. carriage to a port, ship, then train in three actions.
+    This is a 0-1 BFS over a layered graph: city -> neighbor costs 1, city -> hub costs 1 and
+    hub -> member costs 0, with one hub per railroad network plus one for the ports. The 0-cost
+    hub exits are taken as soon as a hub is entered, so the deque reduces to a FIFO queue, and
+    a hub is entered only once, from its first dequeued member, because later members cannot
+    reach it any sooner. Use Board.get_distance_field / get_movement_path for the cached version.
+    Returns: (distance, previous) dicts; distance maps city -> actions needed (source included
+             with 0, unreachable cities missing), previous maps city -> the city one move earlier
+    """
+    connections = board.CITY_CONNECTIONS
+    port_cities = board.PORT_CITIES
+    get_network = board.get_railroad_network
+    distance = {source: 0}
+    previous = {}
+    frontier = [source]
+    entered_networks = set()
+    ports_entered = False
+    for city in frontier:   # the list grows while iterating: a FIFO queue without pops
+        step = distance[city] + 1
+        for other in connections[city]:
+            if other not in distance:
+                distance[other] = step
+                previous[other] = city
+                frontier.append(other)
+        network = get_network(city)
+        if network and id(network) not in entered_networks:
+            entered_networks.add(id(network))
+            for other in network:
+                if other not in distance:
+                    distance[other] = step
+                    previous[other] = city
+                    frontier.append(other)
+        if not ports_entered and city in port_cities:
+            ports_entered = True
+            for other in board.PORT_CITIES_SORTED:
+                if other not in distance:
+                    distance[other] = step
+                    previous[other] = city
+                    frontier.append(other)
+    return distance, previous
+
+
+def trace_movement_path(previous, source, target):   # Time Complexity: O(d) where d = actions on the path
+    # Walk the predecessor links of compute_movement_tree back from `target`; one move action per step
+    if target == source:
+        return [source]
+    if target not in previous:
+        return None
+    path = [target]
+    while target != source:
+        target = previous[target]
+        path.append(target)
+    path.reverse()
+    return path
@@ -1,13 +1,15 @@
-import random
 import time
 import sys
 import select
 import os
 import pygame
 from game_state import GameState
-from board import bfs_shortest_path
 from pygame_visualizer import PygameMapVisualizer
-from cpu_player import choose_starting_city_for_cpu, choose_cpu_action
+from cpu_player import GreedyCpuPolicy
+from mcts_player import ParallelMctsCpuPolicy
+
+
+MCTS_SECONDS_PER_ACTION = 1.0   # thinking time of the look-ahead CPU in interactive games
 
 
 # bug fix: ensures it runs on windows and all platforms
@@ -172,10 +174,11 @@ The fate of Iberia is now in your hands — may your expedition succeed!
     print(intro)
 
 class PandemicTextGame:  
-    def __init__(self):  # Time Complexity: O(V) where V = number of cities
+    def __init__(self, cpu_policy=None):  # Time Complexity: O(V) where V = number of cities
         self.game_state = GameState()
         self.visualizer = None
         self.cpu_players = set()
+        self.cpu_policy = cpu_policy if cpu_policy is not None else GreedyCpuPolicy()
         self._city_name_lookup = {city.lower(): city for city in self.game_state.board.cities}
     
     def update_visualizer(self): # Time Complexity: O(W × H + V) via underlying pygame redraw
@@ -293,31 +296,9 @@ class PandemicTextGame:
     
     def _handle_hand_limit_cpu(self, player): # Time Complexity: O(1) worst case (H ≤ 8, bounded by hand limit check after each card)
         while player.get_hand_size() > player.max_hand_size:
-            color_counts = {}
-            for card in player.hand:
-                color = self.game_state.board.get_city_color(card)
-                if color is not None:
-                    color_counts[color] = color_counts.get(color, 0) + 1
-            
-            if not color_counts:
-                # Fallback: discard first card if no valid colors found
-                discard = next(iter(player.hand), None)
-                if discard is None:
-                    break
-            else:
-                min_count = min(color_counts.values())
-                min_colors = [color for color, count in color_counts.items() if count == min_count]
-                min_color = random.choice(min_colors)
-                discard = None
-                for card in player.hand:
-                    if self.game_state.board.get_city_color(card) == min_color:
-                        discard = card
-                        break
-                if discard is None:
-                    # Fallback if no card matches
-                    discard = next(iter(player.hand), None)
-                    if discard is None:
-                        break
+            discard = self.cpu_policy.choose_discard(self.game_state, player)
+            if discard is None:
+                break
             
             player.remove_card(discard)
             self.game_state.player_discard.push(discard)
@@ -356,18 +337,8 @@ class PandemicTextGame:
         discard_count = len(discard_stack)
         print(f"Cards in {pile_name}: {discard_count}")
         print("-"*60)
-        discard_list = []
-        temp_stack = []
-        while not discard_stack.is_empty():
-            card = discard_stack.pop()
-            discard_list.append(card)
-            temp_stack.append(card)
-        
-        for card in reversed(temp_stack):
-            discard_stack.push(card)
-        
-        if discard_list:
-            for card in discard_list:
+        if discard_count:
+            for card in discard_stack:  # read-only walk, top card first
                 if format_epidemic and card == 'EPIDEMIC':
                     card_formatted = card
                 else:
@@ -377,6 +348,22 @@ class PandemicTextGame:
             print("  (empty)")
         print("-"*60)
     
+    def _choose_cpu_policy(self): # Time Complexity: O(1)
+        while True:
+            response = get_user_input(
+                "CPU player type? (greedy/mcts, default = greedy): "
+            ).strip().lower()
+            if response in ("greedy", ""):
+                self.cpu_policy = GreedyCpuPolicy()
+                print("   -> Greedy CPU: picks the locally best action, no look-ahead.")
+                return
+            elif response == "mcts":
+                self.cpu_policy = ParallelMctsCpuPolicy(time_budget=MCTS_SECONDS_PER_ACTION)
+                print(f"   -> Look-ahead CPU: checks the greedy move against the alternatives for {MCTS_SECONDS_PER_ACTION:g}s per action on {self.cpu_policy.workers} core(s).")
+                return
+            else:
+                print("   Please answer 'greedy' or 'mcts'.")
+    
     def setup_game(self): # Time Complexity: O(P + C) where P = number of players, C = number of cards
         if self.game_state.game_started:
             print("✗ Game has already started. Cannot setup again.")
@@ -413,11 +400,10 @@ class PandemicTextGame:
             print(f"   - Player {player.id + 1} received 4 cards: {', '.join(formatted_cards)}")
         
         epidemic_cards = ['EPIDEMIC'] * 5
-        all_remaining = []
-        while not self.game_state.player_deck.is_empty():
-            all_remaining.append(self.game_state.player_deck.dequeue())
+        all_remaining = list(self.game_state.player_deck)
+        self.game_state.player_deck.clear()
         all_remaining.extend(epidemic_cards)
-        random.shuffle(all_remaining)
+        self.game_state.rng.shuffle(all_remaining)
         for card in all_remaining:
             self.game_state.player_deck.enqueue(card)
         
@@ -428,7 +414,7 @@ class PandemicTextGame:
         for player in self.game_state.players:
             formatted_cards = self._format_hand(player)
             if player.id in self.cpu_players:
-                city = choose_starting_city_for_cpu(self.game_state, player)
+                city = self.cpu_policy.choose_starting_city(self.game_state, player)
                 player.location = city
                 city_formatted = self.format_city_name(city)
                 print(f"\n   ✓ CPU Player {player.id + 1} automatically starts in {city_formatted}")
@@ -475,6 +461,7 @@ class PandemicTextGame:
             if response in ("yes", "y", ""):
                 self.cpu_players.add(player2.id)
                 print("   -> Player 2 will be controlled by the CPU.")
+                self._choose_cpu_policy()
                 break
             elif response in ("no", "n"):
                 print("   -> Player 2 will be controlled by a human.")
@@ -507,53 +494,59 @@ class PandemicTextGame:
             self.visualizer.update()
             pygame.event.pump()
         
-        last_update = 0
-        update_interval = 0.05  # More frequent updates
+        try:
+            last_update = 0
+            update_interval = 0.05  # More frequent updates
         
-        while True:
-            # Always pump pygame events to keep window responsive
-            if self.visualizer:
-                try:
-                    pygame.event.pump()
-                except:
-                    pass
-            
-            current_time = time.time()
-            if (current_time - last_update) > update_interval:
+            while True:
+                # Always pump pygame events to keep window responsive
                 if self.visualizer:
                     try:
-                        self.visualizer.update()
-                        last_update = current_time
-                    except Exception:
-                        if hasattr(self.visualizer, 'running') and not self.visualizer.running:
-                            print("\nGame window closed. Exiting...")
-                            return
-                        # Silently continue on pygame errors
+                        pygame.event.pump()
+                    except:
                         pass
             
-            if self.check_win():
-                print("\n" + "="*60)
-                print("YOU WON! All four diseases have been researched!")
-                print("="*60)
-                break
+                current_time = time.time()
+                if (current_time - last_update) > update_interval:
+                    if self.visualizer:
+                        try:
+                            self.visualizer.update()
+                            last_update = current_time
+                        except Exception:
+                            if hasattr(self.visualizer, 'running') and not self.visualizer.running:
+                                print("\nGame window closed. Exiting...")
+                                return
+                            # Silently continue on pygame errors
+                            pass
             
-            if self.check_loss():
-                print("\n" + "="*60)
-                print("DEFEAT! Game Over!")
-                print("="*60)
-                break
+                if self.check_win():
+                    print("\n" + "="*60)
+                    print("YOU WON! All four diseases have been researched!")
+                    print("="*60)
+                    break
+            
+                if self.check_loss():
+                    print("\n" + "="*60)
+                    print("DEFEAT! Game Over!")
+                    print("="*60)
+                    break
             
 
-            player = self.game_state.get_current_player()
-            if player.id in self.cpu_players:
-                self.play_cpu_turn(player)
-            else:
-                self.play_turn(player)
-            self.game_state.next_turn()
+                player = self.game_state.get_current_player()
+                if player.id in self.cpu_players:
+                    self.play_cpu_turn(player)
+                else:
+                    self.play_turn(player)
+                self.game_state.next_turn()
             
-            # Force update after each turn
-            if self.visualizer:
-                self.visualizer.mark_dirty()
+                # Force update after each turn
+                if self.visualizer:
+                    self.visualizer.mark_dirty()
+        finally:
+            # Every exit (win, loss, quit, closed window) stops the worker processes of the
+            # look-ahead CPU (ParallelMctsCpuPolicy)
+            if hasattr(self.cpu_policy, 'close'):
+                self.cpu_policy.close()
         
         if self.visualizer:
             self.visualizer.running = False
@@ -649,7 +642,7 @@ class PandemicTextGame:
             
 
 
-            city = self.game_state.infection_deck.dequeue()
+            city = self.game_state.draw_infection_card()
             if city is None:
                 break
             color = self.game_state.board.get_city_color(city)
@@ -725,7 +718,7 @@ class PandemicTextGame:
             
 
 
-            decision = choose_cpu_action(self.game_state, player)
+            decision = self.cpu_policy.choose_action(self.game_state, player)
             action_type = decision[0]
             if action_type == "treat":
                 color = decision[1]
@@ -736,9 +729,18 @@ class PandemicTextGame:
                 dest_formatted = self.format_city_name(destination)
                 cpu_type_print(f"   CPU Action {action_num}/4: Move to {dest_formatted}.")
                 self.action_move(player, destination)
+            elif action_type == "build_railroad":
+                destination = decision[1]
+                dest_formatted = self.format_city_name(destination)
+                cpu_type_print(f"   CPU Action {action_num}/4: Build railroad to {dest_formatted}.")
+                self.action_build_railroad(player, destination)
             elif action_type == "build_hospital":
                 cpu_type_print(f"   CPU Action {action_num}/4: Build Hospital.")
                 self.action_build_hospital(player)
+            elif action_type in ("give", "take"):
+                other_player_num = decision[1]
+                cpu_type_print(f"   CPU Action {action_num}/4: {action_type.capitalize()} a card {'to' if action_type == 'give' else 'from'} Player {other_player_num + 1}.")
+                self.action_share_knowledge(player, other_player_num, give=(action_type == "give"))
             elif action_type == "research":
                 color = decision[1]
                 cpu_type_print(f"   CPU Action {action_num}/4: Research {color} disease.")
@@ -822,7 +824,7 @@ class PandemicTextGame:
         
         return False
     
-    def action_move(self, player, destination): # Time Complexity: O(1) average, O(V + E) worst case
+    def action_move(self, player, destination): # Time Complexity: O(1)
         if destination not in self.game_state.board.cities:
             print(f"✗ Invalid city name: {destination}")
             return False
@@ -858,10 +860,8 @@ class PandemicTextGame:
         print(f"✗ Cannot move to {dest_formatted}. Not connected by carriage, train, or ship.")
         return False
     
-    def can_move_by_train(self, start, end): # Time Complexity: O(V + E)
-        railroad_graph = self.game_state.board.get_railroad_graph()
-        path = bfs_shortest_path(railroad_graph, start, end)
-        return path is not None
+    def can_move_by_train(self, start, end): # Time Complexity: O(1)
+        return self.game_state.board.is_connected_by_railroad(start, end)
     
     def action_build_railroad(self, player, destination): # Time Complexity: O(1)
         if destination not in self.game_state.board.cities:
@@ -1025,7 +1025,7 @@ class PandemicTextGame:
             print("✗ You must be in a city with a hospital")
             return False
         
-        color_cards = [card for card in player.hand if 
+        color_cards = [card for card in sorted(player.hand) if 
                       self.game_state.board.get_city_color(card) == hospital_color]
         
         if len(color_cards) < 5:
@@ -0,0 +1,447 @@
+import random
+from data_structures import Deck, Stack, PersistentStack, PersistentVector
+from board import Board
+from game_state import GameState, Player
+from action_rules import resolve_action
+
+
+MAP_INDEX = Board.MAP_INDEX
+
+
+class PersistentPlayer:
+    __slots__ = ('id', 'location', 'hand', 'actions_remaining', 'max_hand_size',
+                 'cpu_first_action_done', 'cpu_committed_plan')
+
+    @classmethod
+    def from_player(cls, player):  # Time Complexity: O(H)
+        copy = cls.__new__(cls)
+        copy.id = player.id
+        copy.location = player.location
+        copy.hand = frozenset(player.hand)
+        copy.actions_remaining = player.actions_remaining
+        copy.max_hand_size = player.max_hand_size
+        copy.cpu_first_action_done = player.cpu_first_action_done
+        # Plans are small flat dicts that get replaced, never edited in place
+        copy.cpu_committed_plan = player.cpu_committed_plan
+        return copy
+
+    def to_player(self):  # Time Complexity: O(H)
+        player = Player(self.id, self.location)
+        for card in self.hand:
+            player.add_card(card)
+        player.actions_remaining = self.actions_remaining
+        player.max_hand_size = self.max_hand_size
+        player.cpu_first_action_done = self.cpu_first_action_done
+        player.cpu_committed_plan = None if self.cpu_committed_plan is None else dict(self.cpu_committed_plan)
+        return player
+
+    def replace(self, **changes):  # Time Complexity: O(1)
+        copy = PersistentPlayer.__new__(PersistentPlayer)
+        for name in self.__slots__:
+            setattr(copy, name, changes.get(name, getattr(self, name)))
+        return copy
+
+
+class PersistentGameState:
+    """
+    Immutable GameState for keeping many alternative futures alive at once (what-if trees,
+    beam search). Every change returns a new version that shares all untouched structure:
+    cubes sit in a PersistentVector (one city's cubes: O(log n)), decks and discard piles are
+    PersistentStacks (a draw or discard: O(1)), hands and cures are frozensets (H ≤ 8, D = 4).
+    Actions follow the shared rules of action_rules.resolve_action; draws, epidemics, infections
+    and outbreak chains run directly on the persistent piles and cube vector.
+    Convert with from_game_state / to_game_state.
+    """
+    __slots__ = ('cubes', 'cubes_on_board', 'hospitals', 'railroads', 'max_railroads', 'players',
+                 'player_deck', 'infection_deck', 'player_discard', 'infection_discard', 'infection_layers', 'cured_diseases',
+                 'outbreak_count', 'max_outbreaks', 'infection_rate', 'epidemic_count', 'max_epidemics',
+                 'current_player_idx', 'game_started', 'supply_exhausted', 'player_deck_exhausted', 'rng_state')
+
+    @classmethod
+    def from_game_state(cls, game_state):  # Time Complexity: O(V × D + C)
+        board = game_state.board
+        state = cls.__new__(cls)
+        state.cubes = PersistentVector(board.core.cubes)
+        state.cubes_on_board = tuple(board.core.cubes_on_board)
+        state.hospitals = tuple(board.hospitals.items())   # (color, city) in build order
+        state.railroads = frozenset(board.railroads)
+        state.max_railroads = board.max_railroads
+        state.players = tuple(PersistentPlayer.from_player(player) for player in game_state.players)
+        state.player_deck    = PersistentStack(game_state.player_deck.snapshot())
+        state.infection_deck = PersistentStack(game_state.infection_deck.snapshot())
+        state.player_discard    = PersistentStack(game_state.player_discard.snapshot())
+        state.infection_discard = PersistentStack(game_state.infection_discard.snapshot())
+        state.infection_layers  = game_state.infection_layers
+        state.cured_diseases = frozenset(game_state.cured_diseases)
+        state.outbreak_count = game_state.outbreak_count
+        state.max_outbreaks  = game_state.max_outbreaks
+        state.infection_rate = game_state.infection_rate
+        state.epidemic_count = game_state.epidemic_count
+        state.max_epidemics  = game_state.max_epidemics
+        state.current_player_idx = game_state.current_player_idx
+        state.game_started       = game_state.game_started
+        state.supply_exhausted   = game_state.supply_exhausted
+        state.player_deck_exhausted = game_state.player_deck_exhausted
+        state.rng_state = game_state.rng.getstate()
+        return state
+
+    def to_game_state(self, node_pool=None):  # Time Complexity: O(V × D + C)
+        # A fresh, independent mutable GameState, e.g. to hand a chosen future to PandemicTextGame
+        game_state = GameState.__new__(GameState)
+        rng = random.Random.__new__(random.Random)
+        rng.setstate(self.rng_state)
+        game_state.rng = rng
+        board = Board.__new__(Board)
+        board.__setstate__((bytes(self.cubes), dict(self.hospitals), self.railroads, self.max_railroads))
+        game_state.board = board
+        game_state.players = [player.to_player() for player in self.players]
+        game_state.player_deck    = Deck(self.player_deck)
+        game_state.infection_deck = Deck(self.infection_deck)
+        game_state.player_discard    = Stack(node_pool)
+        game_state.player_discard.restore(self.player_discard.snapshot())
+        game_state.infection_discard = Stack(node_pool)
+        game_state.infection_discard.restore(self.infection_discard.snapshot())
+        game_state.infection_layers = self.infection_layers
+        game_state.cured_diseases = set(self.cured_diseases)
+        game_state.outbreak_count = self.outbreak_count
+        game_state.max_outbreaks  = self.max_outbreaks
+        game_state.infection_rate = self.infection_rate
+        game_state.epidemic_count = self.epidemic_count
+        game_state.max_epidemics  = self.max_epidemics
+        game_state.current_player_idx = self.current_player_idx
+        game_state.game_started       = self.game_started
+        game_state.supply_exhausted   = self.supply_exhausted
+        game_state.player_deck_exhausted = self.player_deck_exhausted
+        return game_state
+
+    def replace(self, **changes):  # Time Complexity: O(1), shares every field not in `changes`
+        copy = PersistentGameState.__new__(PersistentGameState)
+        for name in self.__slots__:
+            setattr(copy, name, changes.get(name, getattr(self, name)))
+        return copy
+
+    def replace_player(self, player_id, **changes):  # Time Complexity: O(P)
+        players = list(self.players)
+        players[player_id] = players[player_id].replace(**changes)
+        return self.replace(players=tuple(players))
+
+    # ----- reads -----
+
+    def get_current_player(self):  # Time Complexity: O(1)
+        return self.players[self.current_player_idx]
+
+    def get_cube_count(self, city, color):  # Time Complexity: O(log n)
+        return self.cubes[MAP_INDEX.city_index[city] * MAP_INDEX.num_colors + MAP_INDEX.color_index[color]]
+
+    def get_hospital_color(self, city):  # Time Complexity: O(D)
+        # The first hospital built in a city decides its color, as in Board
+        for color, hospital_city in self.hospitals:
+            if hospital_city == city:
+                return color
+        return None
+
+    def get_hospital_city(self, color):  # Time Complexity: O(D)
+        for built, city in self.hospitals:
+            if built == color:
+                return city
+        return None
+
+    def has_railroad(self, city1, city2):  # Time Complexity: O(1)
+        return frozenset([city1, city2]) in self.railroads
+
+    def get_railroads_remaining(self):  # Time Complexity: O(1)
+        return self.max_railroads - len(self.railroads)
+
+    def is_connected_by_railroad(self, city1, city2):  # Time Complexity: O(R) where R = railroads built (≤ 20)
+        if city1 == city2:
+            return False
+        reached = {city1}
+        frontier = [city1]
+        for city in frontier:   # the list grows while iterating: a FIFO queue without pops
+            for pair in self.railroads:
+                if city in pair:
+                    for other in pair:
+                        if other not in reached:
+                            if other == city2:
+                                return True
+                            reached.add(other)
+                            frontier.append(other)
+        return False
+
+    def check_win(self):  # Time Complexity: O(1)
+        return len(self.cured_diseases) == len(Board.DISEASE_COLORS)
+
+    def check_loss(self):  # Time Complexity: O(1)
+        return (self.outbreak_count >= self.max_outbreaks or self.player_deck_exhausted
+                or self.supply_exhausted)
+
+    # ----- branches -----
+
+    def with_cube_count(self, city, color, count):  # Time Complexity: O(log n)
+        color_index = MAP_INDEX.color_index[color]
+        slot = MAP_INDEX.city_index[city] * MAP_INDEX.num_colors + color_index
+        cubes_on_board = list(self.cubes_on_board)
+        cubes_on_board[color_index] += count - self.cubes[slot]
+        return self.replace(cubes=self.cubes.set(slot, count), cubes_on_board=tuple(cubes_on_board))
+
+    def apply_action(self, action):  # Time Complexity: O(log n + R + H log H)
+        """
+        GameState.perform_action for the current player: the same rules (action_rules.resolve_action),
+        with the effect written into a new version.
+        Returns: the new version, or None when the action is illegal
+        """
+        player = self.get_current_player()
+        effect = resolve_action(self, self.players, self.cured_diseases, player, action)
+        if effect is None:
+            return None
+        kind = effect[0]
+        state = self
+        if kind == "move":
+            state = state.replace_player(player.id, location=effect[1])
+        elif kind == "build_railroad":
+            state = state.replace(railroads=state.railroads | {frozenset(effect[1:])})
+        elif kind == "build_hospital":
+            _, city, color = effect
+            state = state.replace(hospitals=state.hospitals + ((color, city),),
+                                  player_discard=state.player_discard.push(city))
+            state = state.replace_player(player.id, hand=player.hand - {city})
+        elif kind == "treat":
+            _, city, color = effect
+            state = state.with_cube_count(city, color, state.get_cube_count(city, color) - 1)
+        elif kind == "transfer":
+            _, giver_id, receiver_id, card = effect
+            state = state.replace_player(giver_id, hand=state.players[giver_id].hand - {card})
+            state = state.replace_player(receiver_id, hand=state.players[receiver_id].hand | {card})
+        elif kind == "research":
+            _, color, cards = effect
+            state = state.replace(player_discard=state.player_discard.push_top_many(cards[::-1]),
+                                  cured_diseases=state.cured_diseases | {color})
+            state = state.replace_player(player.id, hand=player.hand.difference(cards))
+        return state.replace_player(player.id, actions_remaining=player.actions_remaining - 1)
+
+    def discard(self, player_id, card):  # Time Complexity: O(P + H)
+        player = self.players[player_id]
+        if card not in player.hand:
+            return self
+        state = self.replace(player_discard=self.player_discard.push(card))
+        return state.replace_player(player_id, hand=player.hand - {card})
+
+    def next_turn(self):  # Time Complexity: O(P)
+        player_idx = (self.current_player_idx + 1) % len(self.players)
+        return self.replace(current_player_idx=player_idx).replace_player(player_idx, actions_remaining=4)
+
+    def draw_player_card(self):  # Time Complexity: O(1) for a city card, O(C + k × degree) for an epidemic
+        """
+        GameState.apply_draw_player_card for the current player: a city card joins the hand,
+        an epidemic is resolved on the persistent piles and cube vector (see _ChanceStep) and
+        goes to the player discard. The hand limit is left to the caller (discard).
+        Returns: (new version, card, epidemic_info) as from GameState.draw_player_card
+        """
+        if self.player_deck.is_empty():
+            return self.replace(player_deck_exhausted=True), None, None
+        card, player_deck = self.player_deck.pop()
+        if card != 'EPIDEMIC':
+            player = self.get_current_player()
+            state = self.replace(player_deck=player_deck)
+            return state.replace_player(player.id, hand=player.hand | {card}), card, None
+        step = _ChanceStep(self)
+        epidemic_info = step.handle_epidemic()
+        return step.result(player_deck=player_deck, player_discard=self.player_discard.push(card)), card, epidemic_info
+
+    def infect_cities(self):  # Time Complexity: O(infection_rate × (log n + k × degree)), O(C) more on a reshuffle
+        # GameState.infect_cities on the persistent piles and cube vector (see _ChanceStep)
+        step = _ChanceStep(self)
+        step.infect_cities()
+        return step.result()
+
+
+class _ChanceStep:
+    """
+    Scratch record for one draw or infection step of a PersistentGameState: holds the fields
+    such a step can change, starting from the state's own persistent values (only references
+    and the 4-entry cube totals are copied), runs the rules of GameState.handle_epidemic,
+    infect_cities and handle_outbreak on them, and result() writes them into one new version.
+    The RNG state is only turned into a random.Random when a discard pile is reshuffled.
+    """
+    __slots__ = ('state', 'cubes', 'cubes_on_board', 'infection_deck', 'infection_discard', 'infection_layers',
+                 'rng_state', 'outbreak_count', 'epidemic_count', 'supply_exhausted')
+
+    def __init__(self, state):  # Time Complexity: O(D)
+        self.state = state
+        self.cubes = state.cubes
+        self.cubes_on_board = list(state.cubes_on_board)
+        self.infection_deck = state.infection_deck
+        self.infection_discard = state.infection_discard
+        self.infection_layers = state.infection_layers
+        self.rng_state = state.rng_state
+        self.outbreak_count = state.outbreak_count
+        self.epidemic_count = state.epidemic_count
+        self.supply_exhausted = state.supply_exhausted
+
+    def result(self, **changes):  # Time Complexity: O(1)
+        return self.state.replace(cubes=self.cubes, cubes_on_board=tuple(self.cubes_on_board),
+                                  infection_deck=self.infection_deck, infection_discard=self.infection_discard,
+                                  infection_layers=self.infection_layers, rng_state=self.rng_state,
+                                  outbreak_count=self.outbreak_count, epidemic_count=self.epidemic_count,
+                                  supply_exhausted=self.supply_exhausted, **changes)
+
+    def check_loss(self):  # Time Complexity: O(1)
+        state = self.state
+        return self.outbreak_count >= state.max_outbreaks or state.player_deck_exhausted or self.supply_exhausted
+
+    def reshuffle_infection_discard(self, place_on_top=False):  # Time Complexity: O(d) where d = infection discard size
+        discard_list = list(self.infection_discard)  # pop order, top card first
+        self.infection_discard = PersistentStack()
+        rng = random.Random.__new__(random.Random)
+        rng.setstate(self.rng_state)
+        rng.shuffle(discard_list)
+        self.rng_state = rng.getstate()
+        if place_on_top:
+            self.infection_deck = self.infection_deck.push_top_many(discard_list)
+            self.infection_layers = (len(discard_list),) + self.infection_layers
+        else:
+            # only done on an empty deck, as in GameState
+            self.infection_deck = PersistentStack(self.infection_deck.snapshot() + tuple(discard_list))
+            self.infection_layers = self.infection_layers + (len(discard_list),)
+
+    def _shrink_infection_layer(self, index):  # Time Complexity: O(L) where L = reshuffled piles on the deck
+        layers = list(self.infection_layers)
+        layers[index] -= 1
+        if layers[index] == 0:
+            del layers[index]
+        self.infection_layers = tuple(layers)
+
+    def add_cube(self, city, color):  # Time Complexity: O(log n)
+        # BoardCore.add_cubes(city, color, 1); Returns: cubes added (0 when the supply is empty)
+        color_index = MAP_INDEX.color_index[color]
+        if self.cubes_on_board[color_index] >= Board.MAX_CUBES_PER_COLOR:
+            return 0
+        slot = MAP_INDEX.city_index[city] * MAP_INDEX.num_colors + color_index
+        self.cubes = self.cubes.set(slot, self.cubes[slot] + 1)
+        self.cubes_on_board[color_index] += 1
+        return 1
+
+    def get_cube_count(self, city, color):  # Time Complexity: O(log n)
+        return self.cubes[MAP_INDEX.city_index[city] * MAP_INDEX.num_colors + MAP_INDEX.color_index[color]]
+
+    def handle_outbreak(self, city, color):  # Time Complexity: O(k × degree × log n) where k = cities in the chain
+        """
+        GameState.handle_outbreak with the chain of BoardCore.spread_outbreak: one BFS level at a
+        time over integer bitmasks of the outbreak neighbors.
+        Returns: True when the supply of `color` ran out during the chain
+        """
+        outbreak_limit = self.state.max_outbreaks - self.outbreak_count
+        if outbreak_limit <= 0:
+            return False
+        masks = MAP_INDEX.outbreak_masks
+        num_colors = MAP_INDEX.num_colors
+        color_index = MAP_INDEX.color_index[color]
+        visited = frontier = 1 << MAP_INDEX.city_index[city]
+        outbreaks = 1
+        supply_exhausted = False
+        while frontier and outbreaks < outbreak_limit:
+            reached = 0
+            while frontier:
+                lowest = frontier & -frontier
+                reached |= masks[lowest.bit_length() - 1]
+                frontier ^= lowest
+            reached &= ~visited
+            visited |= reached
+            while reached and outbreaks < outbreak_limit:
+                lowest = reached & -reached
+                reached ^= lowest
+                slot = (lowest.bit_length() - 1) * num_colors + color_index
+                count = self.cubes[slot]
+                if count >= 3:
+                    outbreaks += 1
+                    frontier |= lowest
+                elif self.cubes_on_board[color_index] < Board.MAX_CUBES_PER_COLOR:
+                    self.cubes = self.cubes.set(slot, count + 1)
+                    self.cubes_on_board[color_index] += 1
+                else:
+                    supply_exhausted = True
+        self.outbreak_count += min(outbreaks, outbreak_limit)
+        return supply_exhausted
+
+    def handle_epidemic(self):  # Time Complexity: O(C + k × degree × log n)
+        # GameState.handle_epidemic, the same info dict included
+        self.epidemic_count += 1
+        if self.infection_deck.is_empty():
+            if self.infection_discard.is_empty():
+                return {'city': None, 'color': None, 'cubes_added': 0, 'outbreak_occurred': False, 'supply_exhausted': False, 'epidemic_steps': []}
+            self.reshuffle_infection_discard()
+
+        if self.infection_layers and sum(self.infection_layers) == len(self.infection_deck):
+            self._shrink_infection_layer(len(self.infection_layers) - 1)
+        bottom_city, self.infection_deck = self.infection_deck.pop_bottom()
+
+        color = Board.CITY_COLORS.get(bottom_city)
+        if color is None:
+            self.infection_discard = self.infection_discard.push(bottom_city)
+            return {'city': bottom_city, 'color': None, 'cubes_added': 0, 'outbreak_occurred': False, 'supply_exhausted': False, 'epidemic_steps': []}
+
+        old_outbreak_count = self.outbreak_count
+        supply_exhausted = False
+        outbreak_occurred = False
+        cubes_added_total = 0
+        epidemic_steps = []
+        for _ in range(3):
+            current_cubes = self.get_cube_count(bottom_city, color)
+            epidemic_steps.append({'type': 'before_add', 'current_cubes': current_cubes})
+            if outbreak_occurred:
+                epidemic_steps.append({'type': 'cube_skipped', 'reason': 'outbreak_already_occurred'})
+                continue
+            if current_cubes >= 3:
+                outbreak_occurred = True
+                outbreak_count_before = self.outbreak_count
+                epidemic_steps.append({'type': 'outbreak_triggered', 'outbreak_count_before': outbreak_count_before})
+                supply_exhausted = self.handle_outbreak(bottom_city, color) or supply_exhausted
+                epidemic_steps.append({'type': 'outbreak_resolved', 'outbreak_count_after': self.outbreak_count,
+                                       'outbreaks_in_chain': self.outbreak_count - outbreak_count_before})
+            elif self.add_cube(bottom_city, color) == 0:
+                supply_exhausted = True
+                epidemic_steps.append({'type': 'supply_exhausted'})
+                break
+            else:
+                cubes_added_total += 1
+                epidemic_steps.append({'type': 'cube_added', 'cubes_after': self.get_cube_count(bottom_city, color)})
+
+        if supply_exhausted:
+            self.supply_exhausted = True
+        self.infection_discard = self.infection_discard.push(bottom_city)
+        self.reshuffle_infection_discard(place_on_top=True)
+        return {
+            'city': bottom_city,
+            'color': color,
+            'cubes_added': cubes_added_total,
+            'outbreak_occurred': outbreak_occurred,
+            'outbreak_count': self.outbreak_count - old_outbreak_count if outbreak_occurred else 0,
+            'supply_exhausted': supply_exhausted,
+            'epidemic_steps': epidemic_steps
+        }
+
+    def infect_cities(self):  # Time Complexity: O(infection_rate × (log n + k × degree × log n)), O(C) on a reshuffle
+        # GameState.infect_cities: a city that tips the game into a loss stays out of the discard pile
+        for _ in range(self.state.infection_rate):
+            if self.supply_exhausted:
+                return
+            if self.infection_deck.is_empty():
+                if self.infection_discard.is_empty():
+                    continue
+                self.reshuffle_infection_discard()
+            if self.infection_layers:
+                self._shrink_infection_layer(0)
+            city, self.infection_deck = self.infection_deck.pop()
+            color = Board.CITY_COLORS.get(city)
+            if color is not None:
+                if self.get_cube_count(city, color) < 3:
+                    if self.add_cube(city, color) == 0:
+                        self.supply_exhausted = True
+                        return
+                else:
+                    if self.handle_outbreak(city, color):
+                        self.supply_exhausted = True
+                        return
+                    if self.check_loss():
+                        return
+            self.infection_discard = self.infection_discard.push(city)
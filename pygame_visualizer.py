@@ -200,6 +200,9 @@ class PygameMapVisualizer:
     HOSPITAL_SCALE = 0.026
     
     TEXT_COLOR = (0, 0, 0)
+    OUTBREAK_RISK_COLOR = (200, 0, 0)
+    OUTBREAK_RISK_RADIUS = 14
+    OUTBREAK_RISK_WIDTH = 2
     FONT_SIZE = 12
     
     def __init__(self, game_state):  # Time Complexity: O(V) where V = number of cities
@@ -385,7 +388,7 @@ class PygameMapVisualizer:
         
         return False
     
-    def build_status_board_surface(self): # Time Complexity: O(V) where V = number of cities
+    def build_status_board_surface(self): # Time Complexity: O(1) (D = 4 colors, constant)
         padding = 7
         line_height = 15
         
@@ -416,11 +419,7 @@ class PygameMapVisualizer:
             if not self.game_state.game_started:
                 cubes_remaining = max_cubes_per_color
             else:
-                cubes_on_board = sum(
-                    self.game_state.board.disease_cubes[city].get(color, 0)
-                    for city in self.game_state.board.cities
-                )
-                cubes_remaining = max(0, max_cubes_per_color - cubes_on_board)
+                cubes_remaining = self.game_state.board.get_cube_supply_remaining(color)
             lines.append((f"- {color_names[color]}:", f"{cubes_remaining}/{max_cubes_per_color}"))
         
         railroads_remaining = self.game_state.board.get_railroads_remaining()
@@ -467,23 +466,13 @@ class PygameMapVisualizer:
         self.status_board_rect = pygame.Rect(box_x, box_y, box_width, box_height)
         self.status_board_dirty = False
     
-    def check_status_board_needs_rebuild(self): # Time Complexity: O(V) where V = number of cities
+    def check_status_board_needs_rebuild(self): # Time Complexity: O(1)
         if self.status_board_surface is None or self.status_board_dirty:
             return True
         
         try:
-            state_hash = (
-                tuple(sorted(self.game_state.cured_diseases)),
-                self.game_state.epidemic_count,
-                self.game_state.outbreak_count,
-                len(self.game_state.player_deck),
-                self.game_state.board.get_railroads_remaining(),
-                sum(
-                    self.game_state.board.disease_cubes[city].get(color, 0)
-                    for city in self.game_state.board.cities
-                    for color in ['red', 'blue', 'black', 'yellow']
-                )
-            )
+            # Covers everything the status board shows (cures, counters, deck size, railroads, cube supply)
+            state_hash = self.game_state.zobrist_hash
             
             if state_hash != self.last_game_state_hash:
                 self.last_game_state_hash = state_hash
@@ -498,7 +487,7 @@ class PygameMapVisualizer:
             self.last_city_states = {}
             for city in self.game_state.board.cities:
                 self.last_city_states[city] = (
-                    tuple(sorted(self.game_state.board.disease_cubes[city].items())),
+                    self.game_state.board.get_city_cubes(city),
                     self.game_state.board.has_hospital(city),
                     tuple(i for i, p in enumerate(self.game_state.players) if p.location == city)
                 )
@@ -506,7 +495,7 @@ class PygameMapVisualizer:
         
         for city in self.game_state.board.cities:
             current_state = (
-                tuple(sorted(self.game_state.board.disease_cubes[city].items())),
+                self.game_state.board.get_city_cubes(city),
                 self.game_state.board.has_hospital(city),
                 tuple(i for i, p in enumerate(self.game_state.players) if p.location == city)
             )
@@ -552,17 +541,16 @@ class PygameMapVisualizer:
         elements = []
         board = self.game_state.board
         city_color = board.get_city_color(city)
-        cubes = board.disease_cubes[city]
-        
-        if board.has_hospital(city):
-            color = board.get_hospital_color(city)
-            if color and color in self.hospital_images:
-                elements.append({
-                    'type': 'hospital',
-                    'image': self.hospital_images[color],
-                    'priority': 0,
-                    'color': color
-                })
+        cubes = dict(zip(board.DISEASE_COLORS, board.get_city_cubes(city)))
+        
+        hospital_color = board.get_hospital_color(city)
+        if hospital_color in self.hospital_images:
+            elements.append({
+                'type': 'hospital',
+                'image': self.hospital_images[hospital_color],
+                'priority': 0,
+                'color': hospital_color
+            })
         
         if city_color is not None:
             matching_cube_count = cubes.get(city_color, 0)
@@ -673,6 +661,13 @@ class PygameMapVisualizer:
         draw_y = y - (img_height // 2)
         self.screen.blit(image, (draw_x, draw_y))
     
+    def draw_outbreak_risk(self): # Time Complexity: O(D + T) where T = number of 3-cube cities
+        # Ring around every city whose next infection card would cause an outbreak
+        for city in self.game_state.board.get_outbreak_risk_cities():
+            if city in self.CITY_COORDINATES:
+                pygame.draw.circle(self.screen, self.OUTBREAK_RISK_COLOR, self.CITY_COORDINATES[city],
+                                   self.OUTBREAK_RISK_RADIUS, self.OUTBREAK_RISK_WIDTH)
+    
     def draw_all_cities(self): # Time Complexity: O(V) where V = number of cities
         for city, (city_x, city_y) in self.CITY_COORDINATES.items():
             elements = self.collect_city_elements(city)
@@ -748,6 +743,7 @@ class PygameMapVisualizer:
                 self.draw_map_background()
                 self.draw_connections()
             
+            self.draw_outbreak_risk()
             self.draw_all_cities()
             
             self.draw_status_board()
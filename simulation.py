@@ -0,0 +1,142 @@
+from game_state import GameState
+from cpu_player import GreedyCpuPolicy
+
+
+LOSS_OUTBREAKS        = "outbreaks"
+LOSS_SUPPLY_EXHAUSTED = "supply_exhausted"
+LOSS_DECK_EXHAUSTED   = "player_deck_exhausted"
+
+SETUP_INFECTIONS     = (3, 2, 1)  # cubes placed on each group of 3 setup cities
+STARTING_HAND_SIZE   = 4
+EPIDEMIC_CARD_COUNT  = 5
+
+
+def setup_headless_game(game_state, policies):   # Time Complexity: O(P + C) where P = number of players, C = number of cards
+    """
+    Silent equivalent of PandemicTextGame.setup_game.
+    policies: one CPU policy per seat (see cpu_player.GreedyCpuPolicy)
+    """
+    for cube_count in SETUP_INFECTIONS:
+        for _ in range(3):
+            city = game_state.infection_deck.dequeue()
+            if city is None:
+                break
+            color = game_state.board.get_city_color(city)
+            if color is None:
+                continue
+            game_state.board.add_cubes(city, color, cube_count)
+            game_state.infection_discard.push(city)
+
+    for player in game_state.players:
+        for _ in range(STARTING_HAND_SIZE):
+            player.add_card(game_state.player_deck.dequeue())
+
+    all_remaining = list(game_state.player_deck)
+    game_state.player_deck.clear()
+    all_remaining.extend(['EPIDEMIC'] * EPIDEMIC_CARD_COUNT)
+    game_state.rng.shuffle(all_remaining)
+    for card in all_remaining:
+        game_state.player_deck.enqueue(card)
+
+    for player in game_state.players:
+        player.location = policies[player.id].choose_starting_city(game_state, player)
+
+    game_state.game_started = True
+
+
+def enforce_hand_limit(game_state, player, policy):   # Time Complexity: O(1) worst case (H ≤ 8, bounded by hand limit)
+    while player.get_hand_size() > player.max_hand_size:
+        discard = policy.choose_discard(game_state, player)
+        if discard is None:
+            break
+        player.remove_card(discard)
+        game_state.player_discard.push(discard)
+
+
+def play_headless_turn(game_state, player, policies):   # Time Complexity: O(A × M) where A = number of actions, M = max action complexity
+    """
+    Silent equivalent of PandemicTextGame.play_cpu_turn: 4 actions, 2 player cards, infection.
+    """
+    policy = policies[player.id]
+
+    for _ in range(4):
+        if player.actions_remaining <= 0:
+            break
+        if game_state.check_loss() or game_state.check_win():
+            return
+
+        action = policy.choose_action(game_state, player)
+        if action[0] == "skip":
+            break
+        # Illegal actions are wasted, just like in play_cpu_turn
+        if game_state.perform_action(player, action) and action[0] in ("give", "take"):
+            for p in game_state.players:
+                enforce_hand_limit(game_state, p, policies[p.id])
+
+    if game_state.check_loss() or game_state.check_win():
+        return
+
+    for _ in range(2):
+        if game_state.supply_exhausted:
+            return
+        card, epidemic_info = game_state.draw_player_card()
+        if card is None:
+            return
+        if epidemic_info:
+            game_state.player_discard.push(card)
+        else:
+            player.add_card(card)
+        if game_state.check_loss():
+            return
+        enforce_hand_limit(game_state, player, policy)
+
+    if game_state.check_loss() or game_state.check_win():
+        return
+    game_state.infect_cities()
+
+
+def get_loss_cause(game_state):   # Time Complexity: O(1)
+    if game_state.outbreak_count >= game_state.max_outbreaks:
+        return LOSS_OUTBREAKS
+    if game_state.player_deck_exhausted:
+        return LOSS_DECK_EXHAUSTED
+    if game_state.supply_exhausted:
+        return LOSS_SUPPLY_EXHAUSTED
+    return None
+
+
+def play_headless_game(seed=None, policies=None, max_turns=1000):   # Time Complexity: O(T × A × M) where T = number of turns
+    """
+    Plays one complete CPU vs CPU game without printing, pygame or sleeps.
+    seed: seeds the game's own RNG stream, so (seed, policies) replays bit-for-bit
+    policies: one CPU policy per seat, defaults to the greedy player for both
+    Returns: compact result record (dict)
+    """
+    game_state = GameState(seed)
+    if policies is None:
+        policies = [GreedyCpuPolicy() for _ in game_state.players]
+
+    setup_headless_game(game_state, policies)
+
+    turns = 0
+    while turns < max_turns:
+        if game_state.check_win() or game_state.check_loss():
+            break
+        play_headless_turn(game_state, game_state.get_current_player(), policies)
+        game_state.next_turn()
+        turns += 1
+
+    return {
+        'seed': seed,
+        'won': game_state.check_win(),
+        'loss_cause': get_loss_cause(game_state),
+        'turns': turns,
+        'outbreaks': game_state.outbreak_count,
+        'epidemics': game_state.epidemic_count,
+        'cured': tuple(color for color in game_state.board.DISEASE_COLORS if color in game_state.cured_diseases),
+    }
+
+
+def run_headless_games(seeds, policies=None):   # Time Complexity: O(N) games
+    for seed in seeds:
+        yield play_headless_game(seed, policies)
@@ -0,0 +1,51 @@
+import unittest
+from mcts_player import MctsCpuPolicy, ParallelMctsCpuPolicy
+from simulation import play_headless_game
+
+
+class RecordingPolicy:
+    # Wraps a CPU policy and keeps every action it chooses
+    def __init__(self, policy):  # Time Complexity: O(1)
+        self.policy = policy
+        self.actions = []
+
+    def choose_starting_city(self, game_state, player):   # Time Complexity: see the wrapped policy
+        return self.policy.choose_starting_city(game_state, player)
+
+    def choose_action(self, game_state, player):   # Time Complexity: see the wrapped policy
+        action = self.policy.choose_action(game_state, player)
+        self.actions.append(action)
+        return action
+
+    def choose_discard(self, game_state, player):   # Time Complexity: see the wrapped policy
+        return self.policy.choose_discard(game_state, player)
+
+
+def record_game(make_policy, seed, max_turns):   # Time Complexity: O(T × A × B × R)
+    # Plays `max_turns` turns with one fresh policy on both seats; returns (result, actions chosen)
+    policy = RecordingPolicy(make_policy())
+    try:
+        result = play_headless_game(seed, [policy, policy], max_turns=max_turns)
+    finally:
+        if hasattr(policy.policy, 'close'):
+            policy.policy.close()
+    return result, policy.actions
+
+
+class SeededReplayTest(unittest.TestCase):
+    def test_parallel_search_replays_with_same_seed(self):   # Time Complexity: O(T × A × B × R)
+        def make_policy():   # Time Complexity: O(1)
+            return ParallelMctsCpuPolicy(workers=2, rollouts=40, seed=7)
+        first = record_game(make_policy, 3, max_turns=4)
+        second = record_game(make_policy, 3, max_turns=4)
+        self.assertGreater(len(first[1]), 10)
+        self.assertEqual(first, second)
+
+    def test_search_replays_with_same_seed(self):   # Time Complexity: O(T × A × B × R)
+        def make_policy():   # Time Complexity: O(1)
+            return MctsCpuPolicy(rollouts=40, seed=7)
+        self.assertEqual(record_game(make_policy, 5, max_turns=4), record_game(make_policy, 5, max_turns=4))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import random
+import unittest
+from board import Board
+from game_state import GameState
+from simulation import setup_headless_game
+from cpu_player import GreedyCpuPolicy
+from legal_actions import list_legal_actions
+from persistent_state import PersistentGameState
+from test_undo import fingerprint
+
+
+ACTION_SPACE = ([("move", city) for city in sorted(Board.CITY_CONNECTIONS)]
+                + [("build_railroad", city) for city in sorted(Board.CITY_CONNECTIONS)]
+                + [("build_hospital", city) for city in sorted(Board.CITY_CONNECTIONS)]
+                + [(action_type, color) for action_type in ("treat", "research") for color in Board.DISEASE_COLORS]
+                + [(action_type, player_id) for action_type in ("give", "take") for player_id in (0, 1)])
+
+
+def comparable(game_state):   # Time Complexity: O(V × D + C + R)
+    # fingerprint without what to_game_state legitimately rebuilds: the railroad_version
+    # stamp and the member order of each railroad network list
+    values = fingerprint(game_state)
+    values['railroad_version'] = None
+    values['railroad_networks'] = tuple(sorted((city, tuple(sorted(network)))
+                                               for city, network in game_state.board._railroad_networks.items()))
+    return values
+
+
+def play_lockstep_game(test, seed, max_turns=60):   # Time Complexity: O(T × A × (V × D + C))
+    """
+    Plays one game on a mutable GameState and a PersistentGameState side by side, comparing
+    the two after every step. Half of the action phase steps offer a random action from the
+    whole action space instead of a legal one: both engines must reject it, or both apply it.
+    Every fourth seed starts with a one-card infection deck, so infections reshuffle the discard pile.
+    Returns: number of states compared; every persistent version is compared again at the end,
+             to check that later steps never changed an earlier version
+    """
+    rng = random.Random(seed)
+    game_state = GameState(seed)
+    setup_headless_game(game_state, [GreedyCpuPolicy(), GreedyCpuPolicy()])
+    if seed % 4 == 0:
+        for _ in range(len(game_state.infection_deck) - 1):
+            game_state.infection_discard.push(game_state.infection_deck.dequeue())
+    persistent = PersistentGameState.from_game_state(game_state)
+
+    versions = []
+    def check():   # Time Complexity: O(V × D + C)
+        expected = comparable(game_state)
+        test.assertEqual(comparable(persistent.to_game_state()), expected, f"seed {seed}, step {len(versions)}")
+        versions.append((persistent, expected))
+
+    check()
+    for _ in range(max_turns):
+        if game_state.check_loss() or game_state.check_win():
+            break
+        player = game_state.get_current_player()
+        while player.actions_remaining > 0 and not (game_state.check_loss() or game_state.check_win()):
+            legal = list_legal_actions(game_state, player)
+            action = rng.choice(ACTION_SPACE) if rng.random() < 0.5 else rng.choice(legal[:-1] or legal)
+            applied = persistent.apply_action(action)
+            test.assertEqual(game_state.perform_action(player, action), applied is not None, action)
+            if applied is not None:
+                persistent = applied
+            check()
+        for _ in range(2):
+            if game_state.check_loss():
+                break
+            expected_draw = game_state.apply_draw_player_card(player).result
+            persistent, card, epidemic_info = persistent.draw_player_card()
+            test.assertEqual((card, epidemic_info), expected_draw)
+            check()
+            while len(player.hand) > player.max_hand_size:
+                card = sorted(player.hand)[0]
+                game_state.apply_discard(player, card)
+                persistent = persistent.discard(player.id, card)
+                check()
+        if game_state.check_loss() or game_state.check_win():
+            break
+        game_state.apply_infection()
+        persistent = persistent.infect_cities()
+        check()
+        game_state.next_turn()
+        persistent = persistent.next_turn()
+        check()
+
+    for version, expected in versions:
+        test.assertEqual(comparable(version.to_game_state()), expected, f"seed {seed}: an old version changed")
+    return len(versions)
+
+
+class PersistentLockstepTest(unittest.TestCase):
+    def test_matches_mutable_engine(self):   # Time Complexity: O(S × (V × D + C)) where S = steps played
+        steps = sum(play_lockstep_game(self, seed) for seed in range(80))
+        self.assertGreater(steps, 5000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import random
+import unittest
+from game_state import GameState
+from simulation import setup_headless_game
+from cpu_player import GreedyCpuPolicy
+from legal_actions import list_legal_actions
+
+
+def fingerprint(game_state):   # Time Complexity: O(V × D + C + R)
+    # Everything a StateDelta may touch, by name: cubes (and their level index), structures, piles,
+    # players, counters and the RNG state
+    board = game_state.board
+    core = board.core
+    return {
+        'zobrist_hash': game_state.zobrist_hash, 'computed_zobrist_hash': game_state.compute_zobrist_hash(),
+        'cubes': bytes(core.cubes), 'cubes_on_board': tuple(core.cubes_on_board), 'core_zobrist': core.zobrist,
+        'level_masks': tuple(core.level_masks),
+        'hospitals': tuple(board.hospitals.items()), 'hospital_colors': tuple(board._hospital_colors.items()),
+        'structure_zobrist': board._structure_zobrist,
+        'railroads': frozenset(board.railroads), 'railroad_version': board.railroad_version,
+        'railroad_networks': tuple(sorted((city, tuple(network)) for city, network in board._railroad_networks.items())),
+        'player_deck': game_state.player_deck.snapshot(), 'infection_deck': game_state.infection_deck.snapshot(),
+        'player_discard': game_state.player_discard.snapshot(), 'infection_discard': game_state.infection_discard.snapshot(),
+        'infection_layers': game_state.infection_layers,
+        'players': tuple((player.location, player.zobrist, frozenset(player.hand), player.actions_remaining,
+                          player.cpu_first_action_done, repr(player.cpu_committed_plan)) for player in game_state.players),
+        'cured_diseases': frozenset(game_state.cured_diseases), 'outbreak_count': game_state.outbreak_count,
+        'epidemic_count': game_state.epidemic_count, 'infection_rate': game_state.infection_rate,
+        'current_player_idx': game_state.current_player_idx, 'supply_exhausted': game_state.supply_exhausted,
+        'player_deck_exhausted': game_state.player_deck_exhausted, 'rng_state': game_state.rng.getstate(),
+    }
+
+
+def computed_level_masks(core):   # Time Complexity: O(V × D)
+    # BoardCore.level_masks rebuilt from the cube bytes, to check the incremental updates
+    masks = [0] * len(core.level_masks)
+    for slot, count in enumerate(core.cubes):
+        if count:
+            masks[(count - 1) * core.num_colors + slot % core.num_colors] |= 1 << (slot // core.num_colors)
+    return masks
+
+
+def play_recorded_game(test, seed, force_reshuffles=False, max_turns=60):   # Time Complexity: O(T × A × (V × D + C))
+    """
+    Plays random legal actions through the apply_* steps, checking that an illegal action
+    changes nothing, then undoes every step newest first and compares each restored state
+    with the fingerprint taken before that step.
+    force_reshuffles: start with a nearly empty infection deck and a higher infection rate,
+                      so infection steps reshuffle the discard pile into the deck
+    Returns: number of steps recorded
+    """
+    rng = random.Random(seed)
+    game_state = GameState(seed)
+    setup_headless_game(game_state, [GreedyCpuPolicy(), GreedyCpuPolicy()])
+    if force_reshuffles:
+        for _ in range(len(game_state.infection_deck) - seed % 3):
+            game_state.infection_discard.push(game_state.infection_deck.dequeue())
+        game_state.infection_rate = 2 + seed % 3
+
+    recorded = []
+    def record(step, *args):   # Time Complexity: O(V × D + C) for the fingerprint
+        before = fingerprint(game_state)
+        delta = step(*args)
+        test.assertIsNotNone(delta)
+        test.assertEqual(game_state.board.core.level_masks, computed_level_masks(game_state.board.core))
+        test.assertLessEqual(sum(game_state.infection_layers), len(game_state.infection_deck))
+        recorded.append((delta, before))
+        return delta
+
+    for _ in range(max_turns):
+        if game_state.check_loss() or game_state.check_win():
+            break
+        player = game_state.get_current_player()
+        while player.actions_remaining > 0 and not (game_state.check_loss() or game_state.check_win()):
+            actions = [action for action in list_legal_actions(game_state, player) if action[0] != "skip"]
+            record(game_state.apply_action, player, rng.choice(actions))
+            unchanged = fingerprint(game_state)
+            test.assertIsNone(game_state.apply_action(player, ("move", player.location)))
+            test.assertEqual(fingerprint(game_state), unchanged)
+        for _ in range(2):
+            if game_state.check_loss():
+                break
+            record(game_state.apply_draw_player_card, player)
+            while len(player.hand) > player.max_hand_size:
+                record(game_state.apply_discard, player, sorted(player.hand)[0])
+        if game_state.check_loss() or game_state.check_win():
+            break
+        record(game_state.apply_infection)
+        record(game_state.apply_next_turn)
+
+    steps = len(recorded)
+    while recorded:
+        delta, before = recorded.pop()
+        game_state.undo(delta)
+        test.assertEqual(fingerprint(game_state), before, f"seed {seed}, step {len(recorded)}")
+    return steps
+
+
+class UndoRoundTripTest(unittest.TestCase):
+    def test_undo_restores_every_step(self):   # Time Complexity: O(S × (V × D + C)) where S = steps played
+        steps = sum(play_recorded_game(self, seed) for seed in range(100))
+        self.assertGreater(steps, 5000)
+
+    def test_undo_restores_infection_reshuffles(self):   # Time Complexity: O(S × (V × D + C))
+        steps = sum(play_recorded_game(self, seed, force_reshuffles=True) for seed in range(100))
+        self.assertGreater(steps, 5000)
+
+
+if __name__ == "__main__":
+    unittest.main()
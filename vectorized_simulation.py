@@ -0,0 +1,451 @@
+import argparse
+import time
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, only needed for batched sweeps
+    np = None
+
+import random
+from board import Board
+from simulation import (play_headless_game, SETUP_INFECTIONS, STARTING_HAND_SIZE, EPIDEMIC_CARD_COUNT,
+                        LOSS_OUTBREAKS, LOSS_SUPPLY_EXHAUSTED, LOSS_DECK_EXHAUSTED)
+
+
+EPIDEMIC = Board.MAP_INDEX.num_cities  # card id used for 'EPIDEMIC' in the integer player deck
+
+
+def deal_game(seed):   # Time Complexity: O(C)
+    """
+    Replays the RNG calls of GameState(seed) + setup_headless_game on city indices,
+    without building a board. Shuffles only depend on list length, so the permutations match.
+    Returns: (rng, player_deck, infection_deck) where player_deck still starts with the
+             2 × STARTING_HAND_SIZE cards dealt to the players (seat 0 first)
+    """
+    rng = random.Random(seed)
+    city_cards = list(range(Board.MAP_INDEX.num_cities))
+    rng.shuffle(city_cards)
+    infection_cards = city_cards.copy()
+    rng.shuffle(infection_cards)
+
+    dealt = 2 * STARTING_HAND_SIZE
+    remaining = city_cards[dealt:] + [EPIDEMIC] * EPIDEMIC_CARD_COUNT
+    rng.shuffle(remaining)
+    return rng, city_cards[:dealt] + remaining, infection_cards
+
+
+class LockstepPolicy:
+    """
+    Deterministic CPU policy simple enough to run as array operations:
+    treat the most common color where you stand, otherwise step to the carriage
+    neighbor holding the most cubes, otherwise pass. It never builds or researches.
+    Works with the scalar headless engine too, which is how the batch engine is checked.
+    """
+    def choose_starting_city(self, game_state, player):   # Time Complexity: O(H)
+        return min(player.hand, key=Board.MAP_INDEX.city_index.__getitem__)
+
+    def choose_action(self, game_state, player):   # Time Complexity: O(D × degree)
+        map_index = Board.MAP_INDEX
+        core = game_state.board.core
+        location = map_index.city_index[player.location]
+
+        cubes = core.get_city_cubes(location)
+        color = max(range(len(cubes)), key=cubes.__getitem__)  # first maximum = lowest color index
+        if cubes[color] > 0:
+            return ("treat", map_index.color_names[color])
+
+        neighbors = map_index.neighbors[location]
+        if neighbors:
+            totals = [sum(core.get_city_cubes(neighbor)) for neighbor in neighbors]
+            best = max(range(len(neighbors)), key=totals.__getitem__)
+            if totals[best] > 0:
+                return ("move", map_index.city_names[neighbors[best]])
+        return ("skip", None)
+
+    def choose_discard(self, game_state, player):   # Time Complexity: O(H)
+        return max(player.hand, key=Board.MAP_INDEX.city_index.__getitem__)
+
+
+class LockstepBatch:
+    """
+    K games held as NumPy arrays and advanced one phase at a time for all of them:
+    a K×V×D cube tensor, K infection and player deck permutations, K outbreak counters.
+    Follows the rules of GameState.infect_cities, handle_epidemic and handle_outbreak.
+    Each game keeps its own Python RNG (see deal_game), so reshuffles draw exactly
+    what the scalar engine would for the same seed.
+    """
+    def __init__(self, seeds):  # Time Complexity: O(K × C)
+        if np is None:
+            raise ImportError("LockstepBatch needs numpy (pip install numpy)")
+
+        map_index  = Board.MAP_INDEX
+        num_cities = map_index.num_cities
+        num_colors = map_index.num_colors
+        K = len(seeds)
+        self.seeds = list(seeds)
+        self.size  = K
+
+        self.city_colors = np.array(map_index.city_colors, dtype=np.int64)
+        max_degree = max(len(n) for n in map_index.neighbors)
+        # Padding points at a dummy city (index V) whose cube total is always -1
+        self.neighbor_table = np.full((num_cities, max_degree), num_cities, dtype=np.int64)
+        for city, neighbors in enumerate(map_index.neighbors):
+            self.neighbor_table[city, :len(neighbors)] = neighbors
+        self.outbreak_adjacency = np.zeros((num_cities, num_cities), dtype=np.uint8)
+        for city, neighbors in enumerate(map_index.outbreak_neighbors):
+            self.outbreak_adjacency[city, list(neighbors)] = 1
+
+        self.cubes          = np.zeros((K, num_cities, num_colors), dtype=np.int16)
+        self.cubes_on_board = np.zeros((K, num_colors), dtype=np.int16)
+        self.infection_deck    = np.zeros((K, num_cities), dtype=np.int64)
+        self.infection_top     = np.zeros(K, dtype=np.int64)
+        self.infection_end     = np.zeros(K, dtype=np.int64)
+        self.infection_discard = np.zeros((K, num_cities), dtype=np.int64)
+        self.discard_count     = np.zeros(K, dtype=np.int64)
+        self.player_deck = None
+        self.player_top  = np.zeros(K, dtype=np.int64)
+        self.player_end  = np.zeros(K, dtype=np.int64)
+        self.hands     = np.zeros((K, 2, num_cities), dtype=bool)
+        self.locations = np.zeros((K, 2), dtype=np.int64)
+
+        self.outbreak_count = np.zeros(K, dtype=np.int64)
+        self.epidemic_count = np.zeros(K, dtype=np.int64)
+        self.supply_exhausted      = np.zeros(K, dtype=bool)
+        self.player_deck_exhausted = np.zeros(K, dtype=bool)
+        self.current_player = np.zeros(K, dtype=np.int64)
+        self.turns = np.zeros(K, dtype=np.int64)
+
+        self.max_outbreaks = 8
+        self.max_cubes = Board.MAX_CUBES_PER_COLOR
+        self.rngs = []
+
+        player_decks    = np.zeros((K, num_cities - 2 * STARTING_HAND_SIZE + EPIDEMIC_CARD_COUNT), dtype=np.int64)
+        infection_decks = np.zeros((K, num_cities), dtype=np.int64)
+        hands = np.zeros((K, 2 * STARTING_HAND_SIZE), dtype=np.int64)
+        for k, seed in enumerate(self.seeds):
+            rng, player_deck, infection_deck = deal_game(seed)
+            self.rngs.append(rng)
+            hands[k] = player_deck[:2 * STARTING_HAND_SIZE]
+            player_decks[k] = player_deck[2 * STARTING_HAND_SIZE:]
+            infection_decks[k] = infection_deck
+
+        rows = np.arange(K)
+        for seat in range(2):
+            seat_cards = hands[:, seat * STARTING_HAND_SIZE:(seat + 1) * STARTING_HAND_SIZE]
+            self.hands[rows[:, None], seat, seat_cards] = True
+            self.locations[:, seat] = seat_cards.min(axis=1)  # LockstepPolicy.choose_starting_city
+
+        setup_cards = len(SETUP_INFECTIONS) * 3
+        for group, cube_count in enumerate(SETUP_INFECTIONS):
+            for position in range(group * 3, group * 3 + 3):
+                cities = infection_decks[:, position]
+                colors = self.city_colors[cities]
+                self.cubes[rows, cities, colors] = cube_count
+                np.add.at(self.cubes_on_board, (rows, colors), cube_count)
+        self.infection_discard[:, :setup_cards] = infection_decks[:, :setup_cards]
+        self.discard_count[:] = setup_cards
+        self.infection_deck[:, :num_cities - setup_cards] = infection_decks[:, setup_cards:]
+        self.infection_end[:] = num_cities - setup_cards
+
+        self.player_deck = player_decks
+        self.player_end[:] = player_decks.shape[1]
+
+    # ---------------------------------------------------------------- cubes
+
+    def _add_one_cube(self, games, cities, colors):   # Time Complexity: O(k)
+        # One cube per game where supply allows. Returns: mask of games whose supply was empty
+        empty = self.cubes_on_board[games, colors] >= self.max_cubes
+        ok = ~empty
+        self.cubes[games[ok], cities[ok], colors[ok]] += 1
+        self.cubes_on_board[games[ok], colors[ok]] += 1
+        return empty
+
+    def handle_outbreak(self, games, cities, colors):   # Time Complexity: O(k × V²) per chain level
+        """
+        Vectorized GameState.handle_outbreak for one outbreak per listed game.
+        The chain is resolved level by level with boolean frontier / visited masks;
+        the set of cities reached is the same as the scalar queue produces.
+        Returns: mask (aligned with games) of games that ran out of cubes
+        """
+        n = len(games)
+        num_cities = self.cubes.shape[1]
+        supply_hit = np.zeros(n, dtype=bool)
+        chain   = np.ones(n, dtype=np.int64)
+        active  = self.outbreak_count[games] < self.max_outbreaks
+        chain[~active] = 0
+        visited  = np.zeros((n, num_cities), dtype=bool)
+        frontier = np.zeros((n, num_cities), dtype=bool)
+        rows = np.arange(n)
+        visited[rows, cities] = True
+        frontier[rows, cities] = True
+
+        while active.any():
+            capped = active & (self.outbreak_count[games] + chain >= self.max_outbreaks)
+            chain[capped] = self.max_outbreaks - self.outbreak_count[games[capped]]
+            active &= ~capped
+            if not active.any():
+                break
+
+            reached = (frontier[active].astype(np.uint8) @ self.outbreak_adjacency) > 0
+            idx = np.flatnonzero(active)
+            candidates = reached & ~visited[idx]
+            visited[idx] |= candidates
+
+            level_cubes = self.cubes[games[idx][:, None], np.arange(num_cities)[None, :], colors[idx][:, None]]
+            outbreakers = candidates & (level_cubes >= 3)
+            receivers   = candidates & (level_cubes < 3)
+            chain[idx] += outbreakers.sum(axis=1)
+
+            capped = self.outbreak_count[games[idx]] + chain[idx] >= self.max_outbreaks
+            chain[idx[capped]] = self.max_outbreaks - self.outbreak_count[games[idx[capped]]]
+
+            need  = receivers.sum(axis=1)
+            avail = self.max_cubes - self.cubes_on_board[games[idx], colors[idx]]
+            short = (need > avail) & ~capped
+            supply_hit[idx[short]] = True
+            for j in np.flatnonzero(short):
+                # Rare: the game is lost either way, fill the first cities that still fit
+                keep = np.flatnonzero(receivers[j])[:max(0, avail[j])]
+                receivers[j] = False
+                receivers[j, keep] = True
+            receivers[capped] = False
+
+            g_rows, g_cities = np.nonzero(receivers)
+            self.cubes[games[idx][g_rows], g_cities, colors[idx][g_rows]] += 1
+            np.add.at(self.cubes_on_board, (games[idx], colors[idx]), receivers.sum(axis=1).astype(np.int16))
+
+            next_frontier = np.zeros_like(frontier)
+            next_frontier[idx] = outbreakers
+            next_frontier[idx[capped]] = False
+            frontier = next_frontier
+            active[idx[capped]] = False
+            active[idx] &= outbreakers.any(axis=1)
+
+        self.outbreak_count[games] += chain
+        return supply_hit
+
+    # ---------------------------------------------------------------- decks
+
+    def _reshuffle_infection_discard(self, k, place_on_top):   # Time Complexity: O(C)
+        # Same card order and RNG calls as GameState.reshuffle_infection_discard
+        discard_list = list(self.infection_discard[k, :self.discard_count[k]][::-1])
+        self.rngs[k].shuffle(discard_list)
+        remaining = list(self.infection_deck[k, self.infection_top[k]:self.infection_end[k]])
+        deck = discard_list + remaining if place_on_top else remaining + discard_list
+        self.infection_deck[k, :len(deck)] = deck
+        self.infection_top[k] = 0
+        self.infection_end[k] = len(deck)
+        self.discard_count[k] = 0
+
+    def _push_discard(self, games, cities):   # Time Complexity: O(k)
+        self.infection_discard[games, self.discard_count[games]] = cities
+        self.discard_count[games] += 1
+
+    def _refill_empty_infection_decks(self, games):   # Time Complexity: O(k) plus O(C) per empty deck
+        # Returns: the games that still have a card to draw
+        empty = self.infection_top[games] >= self.infection_end[games]
+        for k in games[empty]:
+            if self.discard_count[k] > 0:
+                self._reshuffle_infection_discard(k, place_on_top=False)
+        return games[self.infection_top[games] < self.infection_end[games]]
+
+    def handle_epidemic(self, games):   # Time Complexity: O(k × V²) plus O(C) reshuffle per game
+        self.epidemic_count[games] += 1
+        games = self._refill_empty_infection_decks(games)
+        if len(games) == 0:
+            return
+
+        self.infection_end[games] -= 1
+        cities = self.infection_deck[games, self.infection_end[games]]
+        colors = self.city_colors[cities]
+        current = self.cubes[games, cities, colors].astype(np.int64)
+
+        to_add = np.maximum(0, 3 - current)
+        avail  = self.max_cubes - self.cubes_on_board[games, colors]
+        short  = avail < to_add
+        added  = np.where(short, np.maximum(avail, 0), to_add).astype(np.int16)
+        self.cubes[games, cities, colors] += added
+        np.add.at(self.cubes_on_board, (games, colors), added)
+        self.supply_exhausted[games[short]] = True
+
+        outbreak = ~short & (current >= 1)
+        if outbreak.any():
+            hit = self.handle_outbreak(games[outbreak], cities[outbreak], colors[outbreak])
+            self.supply_exhausted[games[outbreak][hit]] = True
+
+        self._push_discard(games, cities)
+        for k in games:
+            self._reshuffle_infection_discard(k, place_on_top=True)
+
+    def infect_cities(self, games):   # Time Complexity: O(k × V²) per infection card
+        for _ in range(2):
+            games = games[~self.supply_exhausted[games]]
+            games = self._refill_empty_infection_decks(games)
+            if len(games) == 0:
+                return
+
+            cities = self.infection_deck[games, self.infection_top[games]]
+            self.infection_top[games] += 1
+            colors = self.city_colors[cities]
+            quiet = self.cubes[games, cities, colors] < 3
+
+            empty = self._add_one_cube(games[quiet], cities[quiet], colors[quiet])
+            self.supply_exhausted[games[quiet][empty]] = True
+            survivors = np.ones(len(games), dtype=bool)
+            survivors[np.flatnonzero(quiet)[empty]] = False
+
+            loud = np.flatnonzero(~quiet)
+            if len(loud):
+                hit = self.handle_outbreak(games[loud], cities[loud], colors[loud])
+                self.supply_exhausted[games[loud][hit]] = True
+                survivors[loud[hit]] = False
+                survivors[loud] &= self.outbreak_count[games[loud]] < self.max_outbreaks
+
+            self._push_discard(games[survivors], cities[survivors])
+            games = games[survivors]
+
+    # ---------------------------------------------------------------- turns
+
+    def alive(self):   # Time Complexity: O(K)
+        return ~(self.supply_exhausted | self.player_deck_exhausted
+                 | (self.outbreak_count >= self.max_outbreaks))
+
+    def _play_actions(self, games):   # Time Complexity: O(k × (V + degree)) per action
+        num_colors = self.cubes.shape[2]
+        acting = games.copy()
+        for _ in range(4):
+            if len(acting) == 0:
+                return
+            seat = self.current_player[acting]
+            location = self.locations[acting, seat]
+            here = self.cubes[acting, location]
+            color = here.argmax(axis=1)
+            treat = here[np.arange(len(acting)), color] > 0
+
+            t_games = acting[treat]
+            self.cubes[t_games, location[treat], color[treat]] -= 1
+            self.cubes_on_board[t_games, color[treat]] -= 1
+
+            rest = ~treat
+            totals = np.concatenate(
+                [self.cubes[acting[rest]].sum(axis=2), np.full((rest.sum(), 1), -1, dtype=np.int64)], axis=1)
+            options = self.neighbor_table[location[rest]]
+            option_totals = np.take_along_axis(totals, options, axis=1)
+            best = option_totals.argmax(axis=1)
+            move = option_totals[np.arange(len(best)), best] > 0
+            m_games = acting[rest][move]
+            self.locations[m_games, seat[rest][move]] = options[np.arange(len(best)), best][move]
+
+            # Games that passed end their action phase, like the "skip" branch of play_headless_turn
+            acting = np.concatenate([t_games, m_games])
+            acting.sort()
+
+    def _draw_player_cards(self, games):   # Time Complexity: O(k) plus epidemic cost
+        for _ in range(2):
+            games = games[self.alive()[games]]
+            if len(games) == 0:
+                return
+            empty = self.player_top[games] >= self.player_end[games]
+            self.player_deck_exhausted[games[empty]] = True
+            games = games[~empty]
+
+            cards = self.player_deck[games, self.player_top[games]]
+            self.player_top[games] += 1
+
+            epidemic = cards == EPIDEMIC
+            if epidemic.any():
+                self.handle_epidemic(games[epidemic])
+
+            city_games = games[~epidemic]
+            seat = self.current_player[city_games]
+            self.hands[city_games, seat, cards[~epidemic]] = True
+            over = self.hands[city_games, seat].sum(axis=1) > 7
+            if over.any():
+                # LockstepPolicy.choose_discard: drop the highest city index
+                hand = self.hands[city_games[over], seat[over]]
+                highest = hand.shape[1] - 1 - hand[:, ::-1].argmax(axis=1)
+                self.hands[city_games[over], seat[over], highest] = False
+
+    def play_turn(self):   # Time Complexity: O(K × V²) worst case
+        games = np.flatnonzero(self.alive())
+        if len(games) == 0:
+            return False
+        self._play_actions(games)
+        self._draw_player_cards(games)
+        survivors = games[self.alive()[games]]
+        self.infect_cities(survivors)
+        self.turns[games] += 1
+        self.current_player[games] = 1 - self.current_player[games]
+        return True
+
+    def run(self, max_turns=1000):   # Time Complexity: O(T × K × V²)
+        for _ in range(max_turns):
+            if not self.play_turn():
+                break
+        return self.results()
+
+    def results(self):   # Time Complexity: O(K)
+        records = []
+        for k, seed in enumerate(self.seeds):
+            if self.outbreak_count[k] >= self.max_outbreaks:
+                cause = LOSS_OUTBREAKS
+            elif self.player_deck_exhausted[k]:
+                cause = LOSS_DECK_EXHAUSTED
+            elif self.supply_exhausted[k]:
+                cause = LOSS_SUPPLY_EXHAUSTED
+            else:
+                cause = None
+            records.append({
+                'seed': seed,
+                'won': False,
+                'loss_cause': cause,
+                'turns': int(self.turns[k]),
+                'outbreaks': int(self.outbreak_count[k]),
+                'epidemics': int(self.epidemic_count[k]),
+                'cured': (),
+            })
+        return records
+
+
+def run_lockstep_games(seeds, batch_size=4096):   # Time Complexity: O(N × T × V²) element operations
+    seeds = list(seeds)
+    results = []
+    for start in range(0, len(seeds), batch_size):
+        results.extend(LockstepBatch(seeds[start:start + batch_size]).run())
+    return results
+
+
+def compare_with_scalar(seeds):   # Time Complexity: O(N × scalar game)
+    """
+    Plays the same seeds with LockstepPolicy in the scalar headless engine and in LockstepBatch.
+    Returns: list of (scalar_record, batch_record) pairs that disagree (empty when compatible)
+    """
+    seeds = list(seeds)
+    batch = run_lockstep_games(seeds)
+    mismatches = []
+    for seed, batch_record in zip(seeds, batch):
+        scalar_record = play_headless_game(seed, [LockstepPolicy(), LockstepPolicy()])
+        if scalar_record != batch_record:
+            mismatches.append((scalar_record, batch_record))
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batched NumPy simulation of many games in lockstep")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--check", type=int, default=0, help="also cross-check this many seeds against the scalar engine")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_lockstep_games(range(args.seed, args.seed + args.games), args.batch_size)
+    elapsed = time.perf_counter() - start
+    causes = {}
+    for record in results:
+        causes[record['loss_cause']] = causes.get(record['loss_cause'], 0) + 1
+    print(f"{len(results)} games in {elapsed:.2f}s ({len(results) / elapsed:.0f} games/s)")
+    print(f"Loss causes: {causes}")
+    if args.check:
+        mismatches = compare_with_scalar(range(args.seed, args.seed + args.check))
+        print(f"Scalar cross-check: {args.check - len(mismatches)}/{args.check} seeds identical")
@@ -0,0 +1,47 @@
+import random
+
+
+ZOBRIST_SEED  = 0x5EED_2B0A   # fixed, so hashes are stable across runs and processes
+COUNTER_RANGE = 128           # outbreak / epidemic counters and deck sizes stay far below this
+
+
+class ZobristKeys:
+    """
+    Random 64-bit keys for every piece of game state. A state's hash is the XOR of the keys
+    of everything present, so adding or removing one piece is a single XOR.
+    Cube keys are per (city, color, count); count 0 has key 0, so an empty board hashes to 0.
+    """
+    def __init__(self, map_index, max_cubes_per_color, num_players=2, seed=ZOBRIST_SEED):  # Time Complexity: O(V × D × M + V²) where M = max cubes per color
+        rng = random.Random(seed)
+
+        def keys(count):
+            return tuple(rng.getrandbits(64) for _ in range(count))
+
+        num_cities = map_index.num_cities
+        num_colors = map_index.num_colors
+        self.num_cities  = num_cities
+        self.cube_levels = max_cubes_per_color + 1
+
+        cube_keys = list(keys(num_cities * num_colors * self.cube_levels))
+        cube_keys[::self.cube_levels] = [0] * (num_cities * num_colors)
+        self.cube_keys = tuple(cube_keys)                   # [(city * D + color) * levels + count]
+
+        self.hospital_keys = keys(num_colors * num_cities)  # [color * V + city]
+        self.railroad_keys = keys(num_cities * num_cities)  # [min(i, j) * V + max(i, j)]
+        self.location_keys = keys(num_players * num_cities) # [player * V + city]
+        self.hand_keys     = keys(num_players * num_cities) # [player * V + card]
+        self.cured_keys    = keys(num_colors)
+        self.outbreak_keys = keys(COUNTER_RANGE)
+        self.epidemic_keys = keys(COUNTER_RANGE)
+        self.deck_size_keys      = keys(COUNTER_RANGE)
+        self.current_player_keys = keys(num_players)
+
+    def cube_delta(self, slot, old_count, new_count):   # Time Complexity: O(1)
+        # XOR that turns the hash of `old_count` cubes in slot (city * D + color) into `new_count`
+        base = slot * self.cube_levels
+        return self.cube_keys[base + old_count] ^ self.cube_keys[base + new_count]
+
+    def railroad_key(self, city1, city2):   # Time Complexity: O(1)
+        if city1 > city2:
+            city1, city2 = city2, city1
+        return self.railroad_keys[city1 * self.num_cities + city2]